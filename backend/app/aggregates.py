@@ -0,0 +1,242 @@
+"""Set-based aggregate queries over a user's transactions (GROUP BY in Postgres, not in Python)."""
+from datetime import date
+from uuid import UUID
+
+from sqlalchemy import DateTime, and_, case, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Budget, Goal, Subcategory, Transaction, TransactionTypeEnum, Wallet
+
+
+def _percent(part: int, whole: int) -> float:
+    return round(part * 100 / whole, 1) if whole > 0 else 0.0
+
+
+def _in_window(date_from: date | None, date_to: date | None) -> list:
+    conds = []
+    if date_from is not None:
+        conds.append(Transaction.transaction_date >= date_from)
+    if date_to is not None:
+        conds.append(Transaction.transaction_date <= date_to)
+    return conds
+
+
+async def type_totals(
+    db: AsyncSession, user_id: UUID, date_from: date | None = None, date_to: date | None = None
+) -> list[dict]:
+    """Total amount and count per transaction type."""
+    q = (
+        select(
+            Transaction.type,
+            func.sum(Transaction.amount_cents).label("total_cents"),
+            func.count().label("count"),
+        )
+        .join(Wallet)
+        .where(Wallet.user_id == user_id, *_in_window(date_from, date_to))
+        .group_by(Transaction.type)
+        .order_by(Transaction.type)
+    )
+    result = await db.execute(q)
+    return [
+        {"type": row.type.value, "total_cents": int(row.total_cents), "count": row.count}
+        for row in result
+    ]
+
+
+async def wallet_totals(
+    db: AsyncSession, user_id: UUID, date_from: date | None = None, date_to: date | None = None
+) -> list[dict]:
+    """Inflow (income), outflow (everything else) and balance per wallet; wallets without activity report zeros."""
+    inflow = func.coalesce(
+        func.sum(case((Transaction.type == TransactionTypeEnum.income, Transaction.amount_cents), else_=0)), 0
+    )
+    outflow = func.coalesce(
+        func.sum(case((Transaction.type != TransactionTypeEnum.income, Transaction.amount_cents), else_=0)), 0
+    )
+    q = (
+        select(
+            Wallet.id,
+            Wallet.name,
+            inflow.label("inflow_cents"),
+            outflow.label("outflow_cents"),
+            func.count(Transaction.id).label("count"),
+        )
+        .outerjoin(Transaction, and_(Transaction.wallet_id == Wallet.id, *_in_window(date_from, date_to)))
+        .where(Wallet.user_id == user_id)
+        .group_by(Wallet.id, Wallet.name)
+        .order_by(Wallet.created_at)
+    )
+    result = await db.execute(q)
+    return [
+        {
+            "wallet_id": row.id,
+            "name": row.name,
+            "inflow_cents": int(row.inflow_cents),
+            "outflow_cents": int(row.outflow_cents),
+            "balance_cents": int(row.inflow_cents) - int(row.outflow_cents),
+            "count": row.count,
+        }
+        for row in result
+    ]
+
+
+async def subcategory_totals(
+    db: AsyncSession, user_id: UUID, date_from: date | None = None, date_to: date | None = None
+) -> list[dict]:
+    """Total amount and count per (type, subcategory), largest first."""
+    total = func.sum(Transaction.amount_cents)
+    q = (
+        select(
+            Transaction.subcategory_id,
+            Subcategory.name,
+            Transaction.type,
+            total.label("total_cents"),
+            func.count().label("count"),
+        )
+        .join(Wallet)
+        .join(Subcategory, Transaction.subcategory_id == Subcategory.id)
+        .where(Wallet.user_id == user_id, *_in_window(date_from, date_to))
+        .group_by(Transaction.subcategory_id, Subcategory.name, Transaction.type)
+        .order_by(total.desc())
+    )
+    result = await db.execute(q)
+    return [
+        {
+            "subcategory_id": row.subcategory_id,
+            "name": row.name,
+            "type": row.type.value,
+            "total_cents": int(row.total_cents),
+            "count": row.count,
+        }
+        for row in result
+    ]
+
+
+async def monthly_subcategory_totals(
+    db: AsyncSession, user_id: UUID, date_from: date | None = None, date_to: date | None = None
+) -> list[dict]:
+    """Total amount and count per (month, type, subcategory); newest month first, largest first within a month."""
+    # Truncate a plain timestamp: on a date, date_trunc picks the timestamptz overload and the
+    # session time zone could shift the month boundary.
+    month = func.date_trunc("month", cast(Transaction.transaction_date, DateTime)).label("month")
+    total = func.sum(Transaction.amount_cents)
+    q = (
+        select(month, Transaction.type, Subcategory.name, total.label("total_cents"), func.count().label("count"))
+        .join(Wallet)
+        .join(Subcategory, Transaction.subcategory_id == Subcategory.id)
+        .where(Wallet.user_id == user_id, *_in_window(date_from, date_to))
+        .group_by(month, Transaction.type, Subcategory.name)
+        .order_by(month.desc(), total.desc())
+    )
+    result = await db.execute(q)
+    return [
+        {
+            "month": row.month.date(),
+            "type": row.type.value,
+            "name": row.name,
+            "total_cents": int(row.total_cents),
+            "count": row.count,
+        }
+        for row in result
+    ]
+
+
+async def budget_progress(
+    db: AsyncSession, user_id: UUID, period_start: date | None = None, period_end: date | None = None
+) -> list[dict]:
+    """Spent, remaining and percent used for every budget overlapping the window, in one grouped join."""
+    user_tx = (
+        select(Transaction.subcategory_id, Transaction.amount_cents, Transaction.transaction_date)
+        .join(Wallet)
+        .where(Wallet.user_id == user_id)
+        .subquery()
+    )
+    spent = func.coalesce(func.sum(user_tx.c.amount_cents), 0).label("spent_cents")
+    q = (
+        select(Budget, spent)
+        .outerjoin(
+            user_tx,
+            and_(
+                user_tx.c.subcategory_id == Budget.subcategory_id,
+                user_tx.c.transaction_date >= Budget.period_start,
+                user_tx.c.transaction_date <= Budget.period_end,
+            ),
+        )
+        .where(Budget.user_id == user_id)
+        .group_by(Budget.id)
+        .order_by(Budget.period_start, Budget.created_at)
+    )
+    if period_start is not None:
+        q = q.where(Budget.period_end >= period_start)
+    if period_end is not None:
+        q = q.where(Budget.period_start <= period_end)
+    result = await db.execute(q)
+    rows = []
+    for budget, spent_cents in result:
+        spent_cents = int(spent_cents)
+        rows.append(
+            {
+                "id": budget.id,
+                "user_id": budget.user_id,
+                "subcategory_id": budget.subcategory_id,
+                "limit_cents": budget.limit_cents,
+                "period_start": budget.period_start,
+                "period_end": budget.period_end,
+                "created_at": budget.created_at,
+                "spent_cents": spent_cents,
+                "remaining_cents": budget.limit_cents - spent_cents,
+                "percent_used": _percent(spent_cents, budget.limit_cents),
+            }
+        )
+    return rows
+
+
+async def goal_progress(
+    db: AsyncSession, user_id: UUID, period_start: date | None = None, period_end: date | None = None
+) -> list[dict]:
+    """Progress toward every goal overlapping the window: matching-type totals inside each goal's period."""
+    user_tx = (
+        select(Transaction.type, Transaction.amount_cents, Transaction.transaction_date)
+        .join(Wallet)
+        .where(Wallet.user_id == user_id)
+        .subquery()
+    )
+    progress = func.coalesce(func.sum(user_tx.c.amount_cents), 0).label("progress_cents")
+    q = (
+        select(Goal, progress)
+        .outerjoin(
+            user_tx,
+            and_(
+                user_tx.c.type == Goal.goal_type,
+                user_tx.c.transaction_date >= Goal.period_start,
+                user_tx.c.transaction_date <= Goal.period_end,
+            ),
+        )
+        .where(Goal.user_id == user_id)
+        .group_by(Goal.id)
+        .order_by(Goal.period_start, Goal.created_at)
+    )
+    if period_start is not None:
+        q = q.where(Goal.period_end >= period_start)
+    if period_end is not None:
+        q = q.where(Goal.period_start <= period_end)
+    result = await db.execute(q)
+    rows = []
+    for goal, progress_cents in result:
+        progress_cents = int(progress_cents)
+        rows.append(
+            {
+                "id": goal.id,
+                "user_id": goal.user_id,
+                "title": goal.title,
+                "target_cents": goal.target_cents,
+                "goal_type": goal.goal_type.value,
+                "period_start": goal.period_start,
+                "period_end": goal.period_end,
+                "created_at": goal.created_at,
+                "progress_cents": progress_cents,
+                "remaining_cents": max(goal.target_cents - progress_cents, 0),
+                "percent_complete": _percent(progress_cents, goal.target_cents),
+            }
+        )
+    return rows
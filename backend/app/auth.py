@@ -1,52 +1,160 @@
-from functools import lru_cache
-from typing import Optional
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Awaitable, Callable, Optional
 from uuid import UUID
 
 import httpx
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.cache import TTLCache
 from app.config import settings
-from app.database import get_db
+from app.database import get_session_factory
 from app.models import User
 
 security = HTTPBearer(auto_error=False)
+logger = logging.getLogger(__name__)
 
 
-@lru_cache(maxsize=1)
-def _get_jwks_cached():
-    """Sync fetch JWKS (cached). Use in startup or first request."""
-    with httpx.Client() as client:
-        r = client.get(settings.cognito_jwks_url)
+async def _fetch_jwks() -> dict:
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        r = await client.get(settings.cognito_jwks_url)
         r.raise_for_status()
         return r.json()
 
 
-async def _get_jwks():
-    """Async wrapper; fetches and caches JWKS."""
-    try:
-        return _get_jwks_cached()
-    except Exception:
-        async with httpx.AsyncClient() as client:
-            r = await client.get(settings.cognito_jwks_url)
-            r.raise_for_status()
-            return r.json()
+class JWKSCache:
+    """Cognito signing keys by kid, fetched without blocking the event loop.
+
+    Keys are refreshed every ``ttl_seconds`` by a background task (started from the app
+    lifespan); if that task is not running, stale keys are still served while a refresh
+    runs in the background. An unknown kid (key rotation) triggers at most one refetch
+    per ``min_refetch_seconds``, shared by every request waiting on it.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], Awaitable[dict]] = _fetch_jwks,
+        ttl_seconds: float = 3600,
+        min_refetch_seconds: float = 30,
+    ):
+        self._fetch = fetch
+        self.ttl_seconds = ttl_seconds
+        self.min_refetch_seconds = min_refetch_seconds
+        self._keys: dict[str, dict] = {}
+        self._constructed: dict[str, Key] = {}
+        self._fetched_at: float | None = None
+        self._lock = asyncio.Lock()
+        self._background: asyncio.Task | None = None
+        self._refresher: asyncio.Task | None = None
+
+    @property
+    def _stale(self) -> bool:
+        return self._fetched_at is None or time.monotonic() - self._fetched_at >= self.ttl_seconds
+
+    async def refresh(self) -> None:
+        """Fetch the key set. Concurrent callers share one fetch (single-flight)."""
+        requested_at = time.monotonic()
+        async with self._lock:
+            if self._fetched_at is not None and self._fetched_at >= requested_at:
+                return
+            jwks = await self._fetch()
+            self._keys = {k["kid"]: k for k in jwks.get("keys", []) if k.get("kid")}
+            self._constructed = {}
+            self._fetched_at = time.monotonic()
+
+    async def get_key(self, kid: str) -> dict | None:
+        if self._fetched_at is None:
+            await self.refresh()
+        elif self._stale:
+            self._refresh_in_background()
+        key = self._keys.get(kid)
+        if key is None and time.monotonic() - self._fetched_at >= self.min_refetch_seconds:
+            await self.refresh()
+            key = self._keys.get(kid)
+        return key
+
+    async def get_public_key(self, kid: str) -> Key | None:
+        """Constructed public key for kid; built once per key set instead of on every request."""
+        key = self._constructed.get(kid)
+        if key is None:
+            key_dict = await self.get_key(kid)
+            if key_dict is None:
+                return None
+            key = self._constructed[kid] = jwk.construct(key_dict)
+        return key
+
+    def has_key(self, kid: str) -> bool:
+        return kid in self._keys
+
+    def _refresh_in_background(self) -> None:
+        if self._background is None or self._background.done():
+            self._background = asyncio.create_task(self._safe_refresh())
+
+    async def _safe_refresh(self) -> None:
+        try:
+            await self.refresh()
+        except Exception:
+            logger.warning("JWKS refresh failed; keeping cached keys", exc_info=True)
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.ttl_seconds)
+            await self._safe_refresh()
+
+    async def start(self) -> None:
+        """Warm the cache and start the periodic refresher. Failures are logged, not raised."""
+        await self._safe_refresh()
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.create_task(self._refresh_periodically())
+
+    async def stop(self) -> None:
+        for task in (self._refresher, self._background):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._refresher = self._background = None
+
+
+jwks_cache = JWKSCache(
+    ttl_seconds=settings.jwks_ttl_seconds,
+    min_refetch_seconds=settings.jwks_min_refetch_seconds,
+)
+
+# sha256(token) -> (kid, payload) for tokens that passed full verification, kept until the token's exp.
+_verified_tokens = TTLCache(maxsize=settings.token_cache_size)
+
+# cognito_sub -> users.id, so authenticated requests skip the lookup query. Misses are not cached.
+_user_ids = TTLCache(maxsize=settings.user_id_cache_size, ttl_seconds=settings.user_id_cache_ttl_seconds)
+
+
+def invalidate_user_id(sub: str) -> None:
+    """Forget the cached users.id for a Cognito sub (call when that user is created, changed or deleted)."""
+    _user_ids.pop(sub)
 
 
-def _verify_cognito_token(token: str) -> dict:
+async def _verify_cognito_token(token: str) -> dict:
+    token_hash = hashlib.sha256(token.encode()).hexdigest()
+    cached = _verified_tokens.get(token_hash)
+    if cached is not None and jwks_cache.has_key(cached[0]):
+        return cached[1]
     try:
         unverified = jwt.get_unverified_header(token)
         kid = unverified.get("kid")
         if not kid:
             raise JWTError("missing kid")
-        jwks = _get_jwks_cached()
-        key_dict = next((k for k in jwks.get("keys", []) if k.get("kid") == kid), None)
-        if not key_dict:
+        key = await jwks_cache.get_public_key(kid)
+        if key is None:
             raise JWTError("key not found")
-        key = jwk.construct(key_dict)
         payload = jwt.decode(
             token,
             key,
@@ -57,17 +165,20 @@ def _verify_cognito_token(token: str) -> dict:
         issuer = settings.cognito_issuer
         if payload.get("iss") != issuer:
             raise JWTError("invalid issuer")
-        return payload
     except JWTError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
         )
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        _verified_tokens.set(token_hash, (kid, payload), ttl=exp - time.time())
+    return payload
 
 
 async def get_current_user_id(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: AsyncSession = Depends(get_db),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
 ) -> UUID:
     if not credentials or credentials.credentials is None:
         raise HTTPException(
@@ -81,7 +192,7 @@ async def get_current_user_id(
             detail="Auth not configured",
         )
     try:
-        payload = _verify_cognito_token(token)
+        payload = await _verify_cognito_token(token)
     except HTTPException:
         raise
     except Exception:
@@ -92,14 +203,19 @@ async def get_current_user_id(
     sub = payload.get("sub")
     if not sub:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing sub in token")
-    result = await db.execute(select(User).where(User.cognito_sub == sub))
-    user = result.scalar_one_or_none()
-    if not user:
+    user_id = _user_ids.get(sub)
+    if user_id is not None:
+        return user_id
+    # Own short-lived session: the connection goes back to the pool before the handler runs.
+    async with session_factory() as db:
+        user_id = await db.scalar(select(User.id).where(User.cognito_sub == sub))
+    if not user_id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found. Call PUT /users/me to register.",
         )
-    return user.id
+    _user_ids.set(sub, user_id)
+    return user_id
 
 
 async def get_token_payload(
@@ -118,7 +234,7 @@ async def get_token_payload(
             detail="Auth not configured",
         )
     try:
-        return _verify_cognito_token(token)
+        return await _verify_cognito_token(token)
     except HTTPException:
         raise
     except Exception:
@@ -130,12 +246,12 @@ async def get_token_payload(
 
 async def get_current_user_optional(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: AsyncSession = Depends(get_db),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
 ) -> Optional[UUID]:
     """Use only for routes that can work without auth (e.g. health)."""
     if not credentials or not credentials.credentials:
         return None
     try:
-        return await get_current_user_id(credentials, db)
+        return await get_current_user_id(credentials, session_factory)
     except HTTPException:
         return None
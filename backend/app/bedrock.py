@@ -0,0 +1,134 @@
+"""Long-lived Amazon Bedrock runtime client.
+
+boto3 is blocking, so calls run on a bounded thread pool instead of the event loop; the
+underlying client (and its HTTP connection pool) is created once at startup and reused.
+"""
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator
+
+import boto3
+from botocore.config import Config
+
+from app.config import settings
+
+
+class BedrockClient:
+    def __init__(
+        self,
+        region: str,
+        model_id: str,
+        max_concurrency: int = 8,
+        read_timeout: float = 60,
+        client: Any = None,
+    ):
+        self.model_id = model_id
+        self._client = client or boto3.client(
+            "bedrock-runtime",
+            region_name=region,
+            config=Config(
+                max_pool_connections=max_concurrency,
+                read_timeout=read_timeout,
+                retries={"max_attempts": 3, "mode": "adaptive"},
+            ),
+        )
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="bedrock")
+
+    def _invoke_sync(self, payload: dict) -> dict:
+        response = self._client.invoke_model(modelId=self.model_id, body=json.dumps(payload))
+        return json.loads(response["body"].read())
+
+    async def invoke(self, payload: dict) -> dict:
+        """invoke_model on the worker pool; returns the decoded response body."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._invoke_sync, payload)
+
+    def _stream_sync(self, payload: dict, emit, stop: threading.Event) -> None:
+        response = self._client.invoke_model_with_response_stream(
+            modelId=self.model_id, body=json.dumps(payload)
+        )
+        body = response["body"]
+        try:
+            for event in body:
+                if stop.is_set():
+                    break
+                chunk = event.get("chunk")
+                if chunk:
+                    emit(json.loads(chunk["bytes"]))
+        finally:
+            close = getattr(body, "close", None)
+            if close is not None:
+                close()
+
+    async def stream(self, payload: dict) -> AsyncIterator[dict]:
+        """invoke_model_with_response_stream; yields decoded Anthropic stream events as they arrive.
+
+        The blocking event stream is read on the worker pool and handed to the loop through a
+        queue. Closing the generator early (client went away) stops the reader thread.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        done = object()
+
+        def emit(item: Any) -> None:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                pass  # loop already closed after the consumer went away
+
+        def produce() -> None:
+            try:
+                self._stream_sync(payload, emit, stop)
+            except Exception as e:
+                emit(e)
+            finally:
+                emit(done)
+
+        loop.run_in_executor(self._executor, produce)
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        close = getattr(self._client, "close", None)
+        if close is not None:
+            close()
+
+
+_client: BedrockClient | None = None
+
+
+def init_bedrock_client() -> BedrockClient:
+    """Create the shared client (called from the app lifespan)."""
+    global _client
+    if _client is None:
+        _client = BedrockClient(
+            region=settings.bedrock_region,
+            model_id=settings.bedrock_model_id,
+            max_concurrency=settings.bedrock_max_concurrency,
+            read_timeout=settings.bedrock_read_timeout_seconds,
+        )
+    return _client
+
+
+def close_bedrock_client() -> None:
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
+def get_bedrock_client() -> BedrockClient:
+    """FastAPI dependency; tests override it with a local stub."""
+    return init_bedrock_client()
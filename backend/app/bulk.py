@@ -0,0 +1,60 @@
+"""Bulk transfer through asyncpg's COPY: inserts from Python rows, and query results out as CSV/text."""
+import asyncio
+import contextlib
+from typing import AsyncIterator, Iterable, Sequence
+
+from sqlalchemy import Select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def copy_records(db: AsyncSession, table: str, columns: Sequence[str], records: Iterable[tuple]) -> int:
+    """COPY ``records`` (tuples in ``columns`` order) into ``table``; returns the number of rows written.
+
+    Rows are written on the session's connection and commit or roll back with the session.
+    ORM defaults are not applied, so callers pass every NOT NULL column (ids, created_at, ...).
+    """
+    conn = await db.connection()
+    driver = (await conn.get_raw_connection()).driver_connection
+    if not driver.is_in_transaction():
+        # SQLAlchemy begins the asyncpg transaction lazily on the first statement; without one
+        # COPY would autocommit on its own.
+        await db.execute(text("SELECT 1"))
+    status = await driver.copy_records_to_table(table, records=records, columns=list(columns))
+    return int(status.split()[-1])
+
+
+async def copy_query_out(db: AsyncSession, query: Select, **options) -> AsyncIterator[bytes]:
+    """Stream ``COPY (query) TO STDOUT`` as Postgres sends it; ``options`` go to asyncpg (format, header, ...).
+
+    Postgres formats the rows, so no Python work is done per row. Chunks pass through a small
+    queue: a slow client pauses the COPY instead of buffering the result. Bind values are
+    rendered inline, so the query must only be parameterized with typed values (UUIDs, dates,
+    enums), never raw user strings.
+    """
+    conn = await db.connection()
+    sql = str(query.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    driver = (await conn.get_raw_connection()).driver_connection
+    queue: asyncio.Queue = asyncio.Queue(maxsize=8)
+    done = object()
+
+    async def put(chunk: bytearray) -> None:
+        await queue.put(bytes(chunk))
+
+    async def produce() -> None:
+        try:
+            await driver.copy_from_query(sql, output=put, **options)
+        except Exception as e:
+            await queue.put(e)
+        else:
+            await queue.put(done)
+
+    task = asyncio.create_task(produce())
+    try:
+        while (item := await queue.get()) is not done:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
@@ -0,0 +1,113 @@
+"""Small in-process caches shared by the auth and chat paths."""
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Bounded LRU mapping whose entries also expire.
+
+    Entries live for ``ttl_seconds`` unless ``set`` is given a per-entry ttl (e.g. a token's
+    remaining lifetime); expired entries are never returned and are dropped when read. When
+    full, the least recently used entry is evicted. Not thread-safe; meant for the event loop.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float | None = None):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict[Hashable, tuple[Any, float | None]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key, _MISSING)
+        if item is _MISSING:
+            return default
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        ttl = self.ttl_seconds if ttl is None else ttl
+        if ttl is not None and ttl <= 0:
+            self._data.pop(key, None)
+            return
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._evict()
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.pop(key, _MISSING)
+        return default if item is _MISSING else item[0]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def _evict(self) -> None:
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DataVersions:
+    """Per-user counter bumped whenever a commit changes that user's financial data.
+
+    Caches derived from a user's data store the version they were built from and treat any
+    other version as a miss, so invalidation is just a bump. The time of the last bump also
+    tells read routing whether a replica may not have caught up with the user's writes yet.
+    """
+
+    def __init__(self):
+        self._versions: dict[UUID, int] = {}
+        self._changed_at: dict[UUID, float] = {}
+
+    def get(self, user_id: UUID) -> int:
+        return self._versions.get(user_id, 0)
+
+    def bump(self, user_id: UUID) -> None:
+        self._versions[user_id] = self._versions.get(user_id, 0) + 1
+        self._changed_at[user_id] = time.monotonic()
+
+    def changed_within(self, user_id: UUID, seconds: float) -> bool:
+        changed_at = self._changed_at.get(user_id)
+        return changed_at is not None and time.monotonic() - changed_at < seconds
+
+
+data_versions = DataVersions()
+
+_CHANGED_USERS = "changed_user_ids"
+
+
+def mark_data_changed(db: AsyncSession, user_id: UUID) -> None:
+    """Record that this session changes user_id's wallets/transactions/budgets/goals/subcategories.
+
+    The version is bumped only after the session commits, so a reader can never cache data
+    that predates the write under the new version.
+    """
+    db.sync_session.info.setdefault(_CHANGED_USERS, set()).add(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_changed_users(session: Session) -> None:
+    for user_id in session.info.pop(_CHANGED_USERS, ()):
+        data_versions.bump(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session: Session) -> None:
+    session.info.pop(_CHANGED_USERS, None)
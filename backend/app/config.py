@@ -3,9 +3,46 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     database_url: str = "postgresql+asyncpg://localhost/dalla"
+    database_read_url: str = ""
+    read_your_writes_seconds: float = 5
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 30
+    db_pool_recycle_seconds: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 100
+    db_command_timeout_seconds: float | None = None
+    db_pgbouncer: bool = False
+    db_pool_slow_checkout_ms: float = 100
+    db_pool_metrics_enabled: bool = False
     cognito_region: str = "us-east-1"
     cognito_user_pool_id: str = ""
     cognito_app_client_id: str = ""
+    jwks_ttl_seconds: int = 3600
+    jwks_min_refetch_seconds: int = 30
+    token_cache_size: int = 10000
+    user_id_cache_size: int = 10000
+    user_id_cache_ttl_seconds: int = 300
+    bedrock_region: str = "us-east-1"
+    bedrock_model_id: str = "global.anthropic.claude-haiku-4-5-20251001-v1:0"
+    bedrock_max_tokens: int = 350
+    bedrock_max_concurrency: int = 8
+    bedrock_read_timeout_seconds: int = 60
+    # Only takes effect once system prompt + context reach the model's minimum cacheable length
+    # (2048+ tokens for Claude Haiku); below it, e.g. with the default chat_context_token_budget, nothing is cached.
+    bedrock_prompt_caching: bool = True
+    chat_context_token_budget: int = 1500
+    chat_context_months: int = 6
+    chat_context_max_connections: int = 2
+    chat_context_cache_size: int = 1000
+    chat_context_cache_ttl_seconds: int = 300
+    chat_response_cache_size: int = 1000
+    chat_response_cache_ttl_seconds: int = 600
+    chat_history_messages: int = 6
+    chat_history_summary_chars: int = 1500
+    seed_default_subcategories: bool = True
+    seed_skip_when_marked: bool = False
+    demo_synthetic_enabled: bool = False
 
     @property
     def cognito_issuer(self) -> str:
@@ -1,24 +1,76 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from uuid import UUID, uuid4
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base
 
+from app.cache import data_versions
 from app.config import settings
+from app.metrics import PoolMetrics
+
+
+def _connect_args() -> dict:
+    """asyncpg options. Behind PgBouncer in transaction mode, consecutive statements may run on
+    different server connections, so prepared statements are neither cached nor reused by name."""
+    if settings.db_pgbouncer:
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            "command_timeout": settings.db_command_timeout_seconds,
+        }
+    return {
+        "statement_cache_size": settings.db_statement_cache_size,
+        "prepared_statement_cache_size": settings.db_statement_cache_size,
+        "command_timeout": settings.db_command_timeout_seconds,
+    }
+
+
+def _create_engine(url: str, metrics: PoolMetrics) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=False,
+        poolclass=metrics.pool_class(),
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args=_connect_args(),
+    )
+
+
+def _session_factory(bind: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        bind,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
 
-engine = create_async_engine(
-    settings.database_url,
-    echo=False,
-)
-async_session_factory = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False,
-)
+
+pool_metrics = PoolMetrics("primary", settings.db_max_overflow, settings.db_pool_slow_checkout_ms)
+engine = _create_engine(settings.database_url, pool_metrics)
+async_session_factory = _session_factory(engine)
+
+# Optional read replica; without DATABASE_READ_URL reads go to the primary.
+if settings.database_read_url:
+    read_pool_metrics = PoolMetrics("replica", settings.db_max_overflow, settings.db_pool_slow_checkout_ms)
+    read_engine = _create_engine(settings.database_read_url, read_pool_metrics)
+    read_session_factory = _session_factory(read_engine)
+else:
+    read_pool_metrics, read_engine, read_session_factory = None, engine, async_session_factory
 
 Base = declarative_base()
 
 
 async def get_db():
+    """Request session for handlers; declare it with ``Depends(get_db, scope="function")``.
+
+    A session checks out a connection only at its first query. With function scope the commit
+    (and the return of the connection) happens as soon as the handler returns, before the
+    response is serialized and sent, and a failed commit becomes an error response.
+    """
     async with async_session_factory() as session:
         try:
             yield session
@@ -28,3 +80,16 @@ async def get_db():
             raise
         finally:
             await session.close()
+
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """For handlers that open their own short-lived sessions (e.g. concurrent queries)."""
+    return async_session_factory
+
+
+def read_session_factory_for(user_id: UUID) -> async_sessionmaker[AsyncSession]:
+    """Replica sessions for a user's reads, except within READ_YOUR_WRITES_SECONDS of a commit
+    that changed their data: those go to the primary so the user sees their own write."""
+    if data_versions.changed_within(user_id, settings.read_your_writes_seconds):
+        return async_session_factory
+    return read_session_factory
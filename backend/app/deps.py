@@ -0,0 +1,28 @@
+"""Request dependencies built from both app.database and app.auth.
+
+They live here because neither of those modules can hold them: app.database is imported by
+app.models, which app.auth imports, so app.database cannot import get_current_user_id
+without a circular import.
+"""
+from uuid import UUID
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.auth import get_current_user_id
+from app.database import read_session_factory_for
+
+
+def get_read_session_factory(
+    user_id: UUID = Depends(get_current_user_id),
+) -> async_sessionmaker[AsyncSession]:
+    """Session factory for the current user's read-only queries (replica unless they just wrote)."""
+    return read_session_factory_for(user_id)
+
+
+async def get_read_db(
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_read_session_factory),
+):
+    """Read-only handler session: like get_db, but on the replica and never committed."""
+    async with session_factory() as session:
+        yield session
@@ -0,0 +1,116 @@
+"""Streaming encoders for transaction exports (NDJSON, Parquet; CSV comes straight from Postgres COPY).
+
+Each encoder consumes batches of rows (tuples in ``COLUMNS`` order, as fetched from a
+server-side cursor) and yields encoded byte chunks, so memory stays bounded by one batch
+whatever the size of the export. Ids, type and tags arrive as text (tags as a JSON array);
+dates and timestamps as Python objects. pyarrow is only imported when Parquet is requested.
+"""
+import io
+import json
+from typing import AsyncIterator, Sequence
+
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+COLUMNS = (
+    "id",
+    "wallet_id",
+    "transaction_date",
+    "type",
+    "subcategory_id",
+    "amount_cents",
+    "description",
+    "tags",
+    "created_at",
+)
+
+Batches = AsyncIterator[Sequence[tuple]]
+
+
+def _plain(row: tuple) -> tuple:
+    """Row with the date and timestamp as ISO strings."""
+    return row[:2] + (row[2].isoformat(),) + row[3:8] + (row[8].isoformat(),)
+
+
+_NDJSON_LINE = "{{" + ", ".join(
+    f'"{name}": {{{i}}}' for i, name in enumerate(COLUMNS)
+) + "}}\n"
+
+
+async def encode_ndjson(batches: Batches) -> AsyncIterator[bytes]:
+    """One JSON object per line; tags are spliced in as the JSON the database returned."""
+    dumps = json.dumps
+    async for batch in batches:
+        yield "".join(
+            _NDJSON_LINE.format(*(value if i in (5, 7) else dumps(value) for i, value in enumerate(_plain(row))))
+            for row in batch
+        ).encode()
+
+
+class _DrainingSink(io.RawIOBase):
+    """Write-only file that hands out what was written since the last ``drain``."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+async def encode_parquet(batches: Batches) -> AsyncIterator[bytes]:
+    """One zstd-compressed row group per batch; the footer is written when the cursor is exhausted."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.string()),
+        ("wallet_id", pa.string()),
+        ("transaction_date", pa.date32()),
+        ("type", pa.dictionary(pa.int8(), pa.string())),
+        ("subcategory_id", pa.string()),
+        ("amount_cents", pa.int64()),
+        ("description", pa.string()),
+        ("tags", pa.list_(pa.string())),
+        ("created_at", pa.timestamp("us")),
+    ])
+    sink = _DrainingSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        async for batch in batches:
+            columns = list(zip(*batch))
+            arrays = [*columns[:7], [json.loads(tags) for tags in columns[7]], columns[8]]
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(arrays, schema)], schema=schema
+            ))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+ENCODERS = {"ndjson": encode_ndjson, "parquet": encode_parquet}
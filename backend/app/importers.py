@@ -0,0 +1,240 @@
+"""Streaming parsers for bank statement uploads (CSV, OFX, QIF).
+
+Each parser consumes the upload as an async iterator of byte chunks and yields
+``(row_number, ImportedRow | error message)`` as soon as a record is complete, so an import
+never holds the whole file in memory. ``row_number`` is the CSV line / OFX or QIF record number.
+"""
+import codecs
+import csv
+import re
+from collections import deque
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from typing import AsyncIterator
+
+FORMATS = ("csv", "ofx", "qif")
+
+_MAX_AMOUNT = Decimal(2**63) / 100  # amount_cents is a BIGINT
+
+_DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%m/%d/%y", "%Y%m%d", "%d.%m.%Y")
+
+# A quoted CSV field left open after this many lines or characters is treated as a stray quote
+_MAX_RECORD_LINES = 100
+_MAX_RECORD_CHARS = 64 * 1024
+
+# PostgreSQL text cannot hold NUL, so COPY would fail the whole import on it
+_NUL_ERROR = "Contains a NUL character"
+
+
+@dataclass
+class ImportedRow:
+    transaction_date: date
+    amount_cents: int  # signed: negative is money out
+    type: str | None = None
+    subcategory: str | None = None
+    description: str | None = None
+
+
+ParsedRow = tuple[int, ImportedRow | str]
+
+
+@lru_cache(maxsize=4096)  # statements repeat the same few hundred dates; strptime is the slow part of a row
+def parse_date(value: str) -> date:
+    value = value.strip().replace("'", "/").replace(" ", "")  # QIF writes 1/5'24 for years after 1999
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        pass
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date: {value!r}")
+
+
+def parse_amount_cents(value: str) -> int:
+    """'1,234.56', '$-12.30', '(12.30)' -> signed cents."""
+    raw = value.strip().replace(",", "").replace("$", "").replace(" ", "")
+    negative = raw.startswith("(") and raw.endswith(")")
+    try:
+        amount = Decimal(raw.strip("()"))
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount: {value!r}") from None
+    if not amount.is_finite() or abs(amount) >= _MAX_AMOUNT:
+        raise ValueError(f"Invalid amount: {value!r}")
+    cents = int((amount * 100).to_integral_value())
+    return -cents if negative else cents
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode the upload incrementally (UTF-8, BOM tolerated) and yield complete lines."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *complete, pending = pending.split("\n")
+        for line in complete:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+# CSV header aliases -> ImportedRow field
+_CSV_COLUMNS = {
+    "date": "date",
+    "transaction_date": "date",
+    "posted": "date",
+    "amount": "amount",
+    "type": "type",
+    "subcategory": "subcategory",
+    "category": "subcategory",
+    "description": "description",
+    "memo": "description",
+    "payee": "description",
+    "name": "description",
+}
+
+
+async def _csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, str | None]]:
+    """Complete CSV records (quoted fields may span lines) with the number of their last line.
+
+    Lines are buffered while a quote is open, tracking quote parity line by line. A record still
+    open after ``_MAX_RECORD_LINES`` lines or ``_MAX_RECORD_CHARS`` characters (or at the end of
+    the file) has a stray quote: it is yielded as ``(first line number, None)`` and the lines
+    after its first are read again as new records.
+    """
+    lines = _lines(chunks)
+    line_number = 0
+    replay: deque[tuple[int, str]] = deque()
+    record: list[tuple[int, str]] = []
+    size = 0
+    quoted = False
+    while True:
+        if replay:
+            number, line = replay.popleft()
+        else:
+            line = await anext(lines, None)
+            if line is None and not record:
+                return
+            line_number += 1
+            number = line_number
+        if line is not None:
+            record.append((number, line))
+            size += len(line)
+            quoted ^= line.count('"') % 2 == 1
+            if not quoted:
+                yield number, "\n".join(text for _, text in record)
+                record, size = [], 0
+                continue
+            if len(record) <= _MAX_RECORD_LINES and size <= _MAX_RECORD_CHARS:
+                continue
+        yield record[0][0], None
+        replay.extendleft(reversed(record[1:]))
+        record, size, quoted = [], 0, False
+
+
+async def parse_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    """CSV with a header row; needs ``date`` and ``amount`` columns, ``type``/``subcategory``/``description`` are optional.
+
+    Quoted fields may span lines, up to ``_MAX_RECORD_LINES`` lines per record.
+    """
+    columns: list[str | None] | None = None
+    async for line_number, joined in _csv_records(chunks):
+        if joined is None:
+            if columns is None:
+                raise ValueError("Unterminated quoted field in the CSV header")
+            yield line_number, "Unterminated quoted field"
+            continue
+        if not joined.strip():
+            continue
+        if "\x00" in joined:
+            if columns is None:
+                raise ValueError(f"CSV header: {_NUL_ERROR}")
+            yield line_number, _NUL_ERROR
+            continue
+        fields = next(csv.reader([joined]))
+        if columns is None:
+            columns = [_CSV_COLUMNS.get(name.strip().lower()) for name in fields]
+            if "date" not in columns or "amount" not in columns:
+                raise ValueError("CSV header must include 'date' and 'amount' columns")
+            continue
+        values = {col: value.strip() for col, value in zip(columns, fields) if col and value.strip()}
+        try:
+            yield line_number, ImportedRow(
+                transaction_date=parse_date(values.get("date", "")),
+                amount_cents=parse_amount_cents(values.get("amount", "")),
+                type=values.get("type", "").lower() or None,
+                subcategory=values.get("subcategory"),
+                description=values.get("description"),
+            )
+        except ValueError as e:
+            yield line_number, str(e)
+
+
+_OFX_FIELD = re.compile(r"<(\w+)>([^<\r\n]*)")
+
+
+async def parse_ofx(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    """OFX 1.x (SGML) or 2.x (XML): one row per <STMTTRN> (DTPOSTED, TRNAMT, NAME, MEMO)."""
+    pending = ""
+    number = 0
+    async for line in _lines(chunks):
+        pending += line + "\n"
+        while True:
+            start = pending.upper().find("<STMTTRN>")
+            end = pending.upper().find("</STMTTRN>", start)
+            if start < 0 or end < 0:
+                break
+            block, pending = pending[start:end], pending[end + len("</STMTTRN>"):]
+            number += 1
+            if "\x00" in block:
+                yield number, _NUL_ERROR
+                continue
+            fields = {tag.upper(): value.strip() for tag, value in _OFX_FIELD.findall(block)}
+            try:
+                description = " - ".join(v for v in (fields.get("NAME"), fields.get("MEMO")) if v) or None
+                yield number, ImportedRow(
+                    transaction_date=parse_date(fields.get("DTPOSTED", "")[:8]),
+                    amount_cents=parse_amount_cents(fields.get("TRNAMT", "")),
+                    description=description,
+                )
+            except ValueError as e:
+                yield number, str(e)
+        if "<STMTTRN>" not in pending.upper():
+            pending = ""  # nothing open: drop headers and closing tags instead of buffering them
+
+
+async def parse_qif(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    """QIF bank/cash accounts: D date, T/U amount, P payee, M memo, L category; records end with ``^``."""
+    fields: dict[str, str] = {}
+    number = 0
+    async for line in _lines(chunks):
+        line = line.strip()
+        if not line or line.startswith("!"):
+            continue
+        if line != "^":
+            fields.setdefault(line[0], line[1:].strip())
+            continue
+        number += 1
+        if any("\x00" in value for value in fields.values()):
+            yield number, _NUL_ERROR
+            fields = {}
+            continue
+        try:
+            description = " - ".join(v for v in (fields.get("P"), fields.get("M")) if v) or None
+            yield number, ImportedRow(
+                transaction_date=parse_date(fields.get("D", "")),
+                amount_cents=parse_amount_cents(fields.get("T") or fields.get("U", "")),
+                subcategory=fields.get("L", "").split(":")[-1] or None,
+                description=description,
+            )
+        except ValueError as e:
+            yield number, str(e)
+        fields = {}
+
+
+PARSERS = {"csv": parse_csv, "ofx": parse_ofx, "qif": parse_qif}
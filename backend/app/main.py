@@ -1,13 +1,17 @@
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import select
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import async_session_factory
-from app.models import Subcategory, TransactionTypeEnum
-from app.routers import budgets, chat, demo, goals, subcategories, transactions, users, wallets
+from app.auth import jwks_cache
+from app.bedrock import close_bedrock_client, init_bedrock_client
+from app.config import settings
+from app.database import async_session_factory, engine, pool_metrics, read_engine, read_pool_metrics
+from app.models import SchemaMarker, Subcategory, TransactionTypeEnum
+from app.routers import budgets, chat, demo, goals, subcategories, summary, transactions, users, wallets
 
 
 DEFAULT_SUBCATEGORIES = [
@@ -25,34 +29,58 @@ DEFAULT_SUBCATEGORIES = [
     (TransactionTypeEnum.donation, "Charity"),
     (TransactionTypeEnum.donation, "Other"),
 ]
+# Bump when DEFAULT_SUBCATEGORIES changes so marked databases are seeded again.
+DEFAULT_SUBCATEGORIES_VERSION = 1
+_SEED_MARKER = "default_subcategories"
 
 
 async def seed_default_subcategories_session(session: AsyncSession) -> None:
-    """Insert default system subcategories if missing. Caller commits."""
-    for tx_type, name in DEFAULT_SUBCATEGORIES:
-        r = await session.execute(
-            select(Subcategory).where(
-                Subcategory.transaction_type == tx_type,
-                Subcategory.name == name,
-                Subcategory.user_id.is_(None),
-            )
+    """Insert missing default system subcategories with one upsert and record the marker. Commits.
+
+    A transaction-scoped advisory lock serializes workers booting at the same time.
+    """
+    await session.execute(select(func.pg_advisory_xact_lock(func.hashtext(_SEED_MARKER))))
+    await session.execute(
+        insert(Subcategory)
+        .values([
+            {"transaction_type": tx_type, "name": name, "is_system": True, "user_id": None}
+            for tx_type, name in DEFAULT_SUBCATEGORIES
+        ])
+        .on_conflict_do_nothing(
+            index_elements=[Subcategory.transaction_type, Subcategory.name],
+            index_where=Subcategory.user_id.is_(None),
+        )
+    )
+    marker = insert(SchemaMarker).values(name=_SEED_MARKER, version=DEFAULT_SUBCATEGORIES_VERSION)
+    await session.execute(
+        marker.on_conflict_do_update(
+            index_elements=[SchemaMarker.name],
+            set_={"version": marker.excluded.version, "updated_at": marker.excluded.updated_at},
         )
-        if r.scalar_one_or_none() is None:
-            session.add(
-                Subcategory(transaction_type=tx_type, name=name, is_system=True, user_id=None)
-            )
+    )
     await session.commit()
 
 
 async def seed_default_subcategories() -> None:
+    if not settings.seed_default_subcategories:
+        return
     async with async_session_factory() as session:
+        if settings.seed_skip_when_marked:
+            version = await session.scalar(select(SchemaMarker.version).where(SchemaMarker.name == _SEED_MARKER))
+            if version is not None and version >= DEFAULT_SUBCATEGORIES_VERSION:
+                return
         await seed_default_subcategories_session(session)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await seed_default_subcategories()
+    if settings.cognito_user_pool_id:
+        await jwks_cache.start()
+    init_bedrock_client()
     yield
+    close_bedrock_client()
+    await jwks_cache.stop()
 
 
 app = FastAPI(title="theCoin API", lifespan=lifespan)
@@ -70,6 +98,7 @@ app.include_router(subcategories.router)
 app.include_router(transactions.router)
 app.include_router(budgets.router)
 app.include_router(goals.router)
+app.include_router(summary.router)
 app.include_router(chat.router)
 app.include_router(demo.router)
 
@@ -77,3 +106,18 @@ app.include_router(demo.router)
 @app.get("/health")
 async def health():
     return {"status": "ok", "app": "theCoin API"}
+
+
+@app.get("/metrics/pool")
+async def pool_stats():
+    """Connection pool utilization and checkout wait times (see app/metrics.py).
+
+    Unauthenticated, so only served with ``DB_POOL_METRICS_ENABLED`` (for deployments where the
+    API is not publicly reachable, or where the proxy blocks /metrics).
+    """
+    if not settings.db_pool_metrics_enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    pools = {pool_metrics.name: pool_metrics.snapshot(engine.pool)}
+    if read_pool_metrics is not None:
+        pools[read_pool_metrics.name] = read_pool_metrics.snapshot(read_engine.pool)
+    return pools
@@ -0,0 +1,82 @@
+"""Connection pool metrics: checkout wait times and utilization, served at GET /metrics/pool."""
+import logging
+import time
+from collections import deque
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(ordered: list[float], q: float) -> float | None:
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 3) if ordered else None
+
+
+class PoolMetrics:
+    """Checkout waits for one engine's pool, plus its current utilization.
+
+    Waits are timed around the pool's own checkout, so they include opening a new connection
+    when the pool is below capacity. Percentiles cover the last ``window`` checkouts; counters
+    cover the process lifetime. Checkouts slower than ``slow_ms`` are logged.
+    """
+
+    def __init__(self, name: str, max_overflow: int, slow_ms: float, window: int = 1000):
+        self.name = name
+        self.max_overflow = max_overflow
+        self.slow_ms = slow_ms
+        self.checkouts = 0
+        self.timeouts = 0
+        self.max_wait_ms = 0.0
+        self._waits_ms: deque[float] = deque(maxlen=window)
+
+    def record_wait(self, seconds: float) -> None:
+        wait_ms = seconds * 1000
+        self.checkouts += 1
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        self._waits_ms.append(wait_ms)
+        if wait_ms >= self.slow_ms:
+            logger.warning("Slow %s pool checkout: %.1f ms", self.name, wait_ms)
+
+    def record_timeout(self) -> None:
+        self.timeouts += 1
+        logger.warning("%s pool checkout timed out (pool exhausted)", self.name)
+
+    def pool_class(self) -> type[AsyncAdaptedQueuePool]:
+        """Pool class for ``create_async_engine(poolclass=...)`` that reports to these metrics.
+
+        A class rather than an instance, so pools recreated by ``engine.dispose()`` keep reporting.
+        """
+        metrics = self
+
+        class InstrumentedPool(AsyncAdaptedQueuePool):
+            def _do_get(self):
+                start = time.perf_counter()
+                try:
+                    connection = super()._do_get()
+                except PoolTimeoutError:
+                    metrics.record_timeout()
+                    raise
+                metrics.record_wait(time.perf_counter() - start)
+                return connection
+
+        return InstrumentedPool
+
+    def snapshot(self, pool: Pool) -> dict:
+        waits = sorted(self._waits_ms)
+        checked_out = pool.checkedout()
+        capacity = pool.size() + self.max_overflow
+        return {
+            "pool_size": pool.size(),
+            "max_overflow": self.max_overflow,
+            "checked_out": checked_out,
+            "idle": pool.checkedin(),
+            "utilization": round(checked_out / capacity, 3) if capacity else None,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_ms": {
+                "p50": _percentile(waits, 0.50),
+                "p99": _percentile(waits, 0.99),
+                "max": round(self.max_wait_ms, 3),
+            },
+        }
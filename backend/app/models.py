@@ -3,7 +3,7 @@ import uuid
 from datetime import date, datetime
 from typing import List, Optional
 
-from sqlalchemy import Boolean, BigInteger, Date, Enum, ForeignKey, Text, UniqueConstraint
+from sqlalchemy import Boolean, BigInteger, Date, Enum, ForeignKey, Index, Text, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -29,6 +29,9 @@ class User(Base):
     budgets: Mapped[List["Budget"]] = relationship(back_populates="user", cascade="all, delete-orphan")
     goals: Mapped[List["Goal"]] = relationship(back_populates="user", cascade="all, delete-orphan")
     subcategories: Mapped[List["Subcategory"]] = relationship(back_populates="user", cascade="all, delete-orphan")
+    chat_sessions: Mapped[List["ChatSession"]] = relationship(
+        back_populates="user", cascade="all, delete-orphan", passive_deletes=True
+    )
 
 
 class Wallet(Base):
@@ -37,8 +40,12 @@ class Wallet(Base):
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     name: Mapped[str] = mapped_column(nullable=False)
+    # Created by the synthetic history generator, which replaces only these wallets
+    is_synthetic: Mapped[bool] = mapped_column(nullable=False, default=False, server_default=text("false"))
     created_at: Mapped[datetime] = mapped_column(nullable=False, default=datetime.utcnow)
 
+    __table_args__ = (Index("ix_wallets_user_id", "user_id"),)
+
     user: Mapped["User"] = relationship(back_populates="wallets")
     transactions: Mapped[List["Transaction"]] = relationship(back_populates="wallet", cascade="all, delete-orphan")
 
@@ -52,7 +59,18 @@ class Subcategory(Base):
     is_system: Mapped[bool] = mapped_column(nullable=False, default=False)
     user_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
 
-    __table_args__ = (UniqueConstraint("transaction_type", "name", "user_id", name="uq_subcategories_type_name_user"),)
+    __table_args__ = (
+        UniqueConstraint("transaction_type", "name", "user_id", name="uq_subcategories_type_name_user"),
+        # NULLs are distinct in the constraint above, so system rows need their own unique index.
+        Index(
+            "uq_subcategories_system_type_name",
+            "transaction_type",
+            "name",
+            unique=True,
+            postgresql_where=text("user_id IS NULL"),
+        ),
+        Index("ix_subcategories_user_id", "user_id"),
+    )
 
     user: Mapped[Optional["User"]] = relationship(back_populates="subcategories")
 
@@ -70,6 +88,13 @@ class Transaction(Base):
     transaction_date: Mapped[date] = mapped_column(Date, nullable=False)
     created_at: Mapped[datetime] = mapped_column(nullable=False, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Wallet-scoped listing, keyset pagination and "most recent" queries (scanned backwards for DESC).
+        Index("ix_transactions_wallet_date", "wallet_id", "transaction_date", "created_at", "id"),
+        # Budget progress: transactions per subcategory inside a date window.
+        Index("ix_transactions_subcategory_date", "subcategory_id", "transaction_date"),
+    )
+
     wallet: Mapped["Wallet"] = relationship(back_populates="transactions")
 
 
@@ -84,6 +109,8 @@ class Budget(Base):
     period_end: Mapped[date] = mapped_column(Date, nullable=False)
     created_at: Mapped[datetime] = mapped_column(nullable=False, default=datetime.utcnow)
 
+    __table_args__ = (Index("ix_budgets_user_period", "user_id", "period_start", "period_end"),)
+
     user: Mapped["User"] = relationship(back_populates="budgets")
 
 
@@ -99,4 +126,52 @@ class Goal(Base):
     period_end: Mapped[date] = mapped_column(Date, nullable=False)
     created_at: Mapped[datetime] = mapped_column(nullable=False, default=datetime.utcnow)
 
+    __table_args__ = (Index("ix_goals_user_period", "user_id", "period_start", "period_end"),)
+
     user: Mapped["User"] = relationship(back_populates="goals")
+
+
+class ChatSession(Base):
+    __tablename__ = "chat_sessions"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    title: Mapped[str] = mapped_column(nullable=False)
+    # Extractive summary of the turns that fell out of the history window, and how many messages it covers.
+    summary: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    summarized_count: Mapped[int] = mapped_column(nullable=False, default=0)
+    message_count: Mapped[int] = mapped_column(nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(nullable=False, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (Index("ix_chat_sessions_user_updated", "user_id", "updated_at"),)
+
+    user: Mapped["User"] = relationship(back_populates="chat_sessions")
+    messages: Mapped[List["ChatMessage"]] = relationship(
+        back_populates="session", cascade="all, delete-orphan", passive_deletes=True, order_by="ChatMessage.position"
+    )
+
+
+class ChatMessage(Base):
+    __tablename__ = "chat_messages"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    session_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("chat_sessions.id", ondelete="CASCADE"), nullable=False)
+    position: Mapped[int] = mapped_column(nullable=False)
+    role: Mapped[str] = mapped_column(nullable=False)  # "user" or "assistant"
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (UniqueConstraint("session_id", "position", name="uq_chat_messages_session_position"),)
+
+    session: Mapped["ChatSession"] = relationship(back_populates="messages")
+
+
+class SchemaMarker(Base):
+    """Version of one-off data setup (e.g. seeded defaults), so startup can tell it is already done."""
+
+    __tablename__ = "schema_markers"
+
+    name: Mapped[str] = mapped_column(primary_key=True)
+    version: Mapped[int] = mapped_column(nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(nullable=False, default=datetime.utcnow)
@@ -2,13 +2,16 @@ from datetime import date
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select
+from sqlalchemy import insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.aggregates import budget_progress
 from app.auth import get_current_user_id
+from app.cache import mark_data_changed
 from app.database import get_db
+from app.deps import get_read_db
 from app.models import Budget
-from app.schemas import BudgetCreate, BudgetResponse, BudgetUpdate
+from app.schemas import BudgetCreate, BudgetProgressResponse, BudgetResponse, BudgetUpdate
 
 router = APIRouter(prefix="/budgets", tags=["budgets"])
 
@@ -34,7 +37,7 @@ async def list_budgets(
     period_start: date | None = Query(None),
     period_end: date | None = Query(None),
     user_id: UUID = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
 ):
     q = select(Budget).where(Budget.user_id == user_id)
     if period_start is not None:
@@ -45,31 +48,40 @@ async def list_budgets(
     return list(result.scalars().all())
 
 
+@router.get("/progress", response_model=list[BudgetProgressResponse])
+async def list_budget_progress(
+    period_start: date | None = Query(None),
+    period_end: date | None = Query(None),
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+):
+    """Budgets with spent / remaining / percent used, computed in a single query."""
+    return await budget_progress(db, user_id, period_start, period_end)
+
+
 @router.post("", response_model=BudgetResponse, status_code=status.HTTP_201_CREATED)
 async def create_budget(
     body: BudgetCreate,
     user_id: UUID = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ):
     _validate_period(body.period_start, body.period_end)
-    b = Budget(
+    values = dict(
         user_id=user_id,
         subcategory_id=body.subcategory_id,
         limit_cents=body.limit_cents,
         period_start=body.period_start,
         period_end=body.period_end,
     )
-    db.add(b)
-    await db.flush()
-    await db.refresh(b)
-    return b
+    mark_data_changed(db, user_id)
+    return await db.scalar(insert(Budget).values(**values).returning(Budget))
 
 
 @router.get("/{id}", response_model=BudgetResponse)
 async def get_budget(
     id: UUID,
     user_id: UUID = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
 ):
     return await _get_budget_or_404(db, id, user_id)
 
@@ -79,25 +91,24 @@ async def update_budget(
     id: UUID,
     body: BudgetUpdate,
     user_id: UUID = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ):
-    b = await _get_budget_or_404(db, id, user_id)
-    if body.subcategory_id is not None:
-        b.subcategory_id = body.subcategory_id
-    if body.limit_cents is not None:
-        b.limit_cents = body.limit_cents
+    values = body.model_dump(exclude_none=True)
+    if not values:
+        return await _get_budget_or_404(db, id, user_id)
+    q = update(Budget).where(Budget.id == id, Budget.user_id == user_id)
+    # A one-sided period change is checked against the stored other end in the same statement.
     if body.period_start is not None and body.period_end is not None:
         _validate_period(body.period_start, body.period_end)
-        b.period_start = body.period_start
-        b.period_end = body.period_end
     elif body.period_start is not None:
-        _validate_period(body.period_start, b.period_end)
-        b.period_start = body.period_start
+        q = q.where(Budget.period_end >= body.period_start)
     elif body.period_end is not None:
-        _validate_period(b.period_start, body.period_end)
-        b.period_end = body.period_end
-    await db.flush()
-    await db.refresh(b)
+        q = q.where(Budget.period_start <= body.period_end)
+    mark_data_changed(db, user_id)
+    b = await db.scalar(q.values(**values).returning(Budget))
+    if not b:
+        await _get_budget_or_404(db, id, user_id)  # 404 if missing; otherwise the period was rejected
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="period_end must be >= period_start")
     return b
 
 
@@ -105,8 +116,9 @@ async def update_budget(
 async def delete_budget(
     id: UUID,
     user_id: UUID = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ):
     b = await _get_budget_or_404(db, id, user_id)
+    mark_data_changed(db, user_id)
     await db.delete(b)
     return None
@@ -1,18 +1,33 @@
+import asyncio
+import hashlib
 import json
 import logging
+import time
+from datetime import date, datetime
+from functools import partial
+from typing import AsyncIterator, Awaitable, Callable, Sequence, TypeVar
 from uuid import UUID
 
-import boto3
 from botocore.exceptions import ClientError
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.aggregates import budget_progress, goal_progress, monthly_subcategory_totals, type_totals, wallet_totals
 from app.auth import get_current_user_id
-from app.database import get_db
-from app.models import Budget, Goal, Subcategory, Transaction, Wallet
-from app.schemas import ChatRequest, ChatResponse
+from app.bedrock import BedrockClient, get_bedrock_client
+from app.cache import TTLCache, data_versions
+from app.config import settings
+from app.database import get_db, get_session_factory
+from app.deps import get_read_session_factory
+from app.models import ChatMessage, ChatSession, Subcategory, Transaction, Wallet
+from app.schemas import (
+    ChatRequest,
+    ChatResponse,
+    ChatSessionDetailResponse,
+    ChatSessionResponse,
+)
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 logger = logging.getLogger(__name__)
@@ -23,62 +38,109 @@ def _format_cents_to_dollars(cents: int) -> str:
     return f"${cents / 100:.2f}"
 
 
-async def _fetch_user_financial_data(db: AsyncSession, user_id: UUID) -> dict:
-    """Fetch all relevant financial data for the user."""
-    
-    # Fetch wallets
-    wallets_result = await db.execute(
-        select(Wallet).where(Wallet.user_id == user_id)
+T = TypeVar("T")
+
+# Raw rows considered for the prompt; how many are included depends on the token budget.
+_RECENT_TRANSACTIONS = 50
+
+
+def _months_back(today: date, months: int) -> date:
+    """First day of the month ``months - 1`` months before ``today``'s month."""
+    index = today.year * 12 + today.month - 1 - (months - 1)
+    return date(index // 12, index % 12 + 1, 1)
+
+
+async def _load_monthly_totals(db: AsyncSession, user_id: UUID) -> list[dict]:
+    return await monthly_subcategory_totals(
+        db, user_id, date_from=_months_back(date.today(), settings.chat_context_months)
     )
-    wallets = list(wallets_result.scalars().all())
-    
-    # Fetch recent transactions with subcategory data
-    transactions_result = await db.execute(
-        select(Transaction)
+
+
+async def _load_recent_transactions(
+    db: AsyncSession, user_id: UUID
+) -> tuple[list[Transaction], dict[UUID, Subcategory]]:
+    """Most recent transactions with their subcategories, in one joined query."""
+    result = await db.execute(
+        select(Transaction, Subcategory)
         .join(Wallet)
         .outerjoin(Subcategory, Transaction.subcategory_id == Subcategory.id)
         .where(Wallet.user_id == user_id)
-        .order_by(Transaction.transaction_date.desc(), Transaction.created_at.desc())
-        .limit(50)
-    )
-    transactions = list(transactions_result.scalars().all())
-    
-    # Load subcategories for transactions
-    subcategory_ids = {tx.subcategory_id for tx in transactions}
-    subcategories_result = await db.execute(
-        select(Subcategory).where(Subcategory.id.in_(subcategory_ids))
-    )
-    subcategories = {sc.id: sc for sc in subcategories_result.scalars().all()}
-    
-    # Fetch budgets with subcategory data
-    budgets_result = await db.execute(
-        select(Budget).where(Budget.user_id == user_id)
+        .order_by(Transaction.transaction_date.desc(), Transaction.created_at.desc(), Transaction.id.desc())
+        .limit(_RECENT_TRANSACTIONS)
     )
-    budgets = list(budgets_result.scalars().all())
-    
-    # Load subcategories for budgets
-    budget_subcategory_ids = {b.subcategory_id for b in budgets}
-    budget_subcategories_result = await db.execute(
-        select(Subcategory).where(Subcategory.id.in_(budget_subcategory_ids))
+    transactions, subcategories = [], {}
+    for tx, sc in result:
+        transactions.append(tx)
+        if sc is not None:
+            subcategories[sc.id] = sc
+    return transactions, subcategories
+
+
+async def _load_budgets(db: AsyncSession, user_id: UUID) -> list[dict]:
+    """Progress of the budgets whose period includes today, each with its subcategory ``name``."""
+    today = date.today()
+    budgets = await budget_progress(db, user_id, period_start=today, period_end=today)
+    ids = {b["subcategory_id"] for b in budgets}
+    names = {}
+    if ids:
+        result = await db.execute(select(Subcategory.id, Subcategory.name).where(Subcategory.id.in_(ids)))
+        names = dict(result.all())
+    return [{**b, "name": names.get(b["subcategory_id"], "Unknown")} for b in budgets]
+
+
+async def _fetch_user_financial_data(
+    session_factory: async_sessionmaker[AsyncSession], user_id: UUID
+) -> dict:
+    """Fetch the user's financial data: SQL aggregates over the full history plus the newest raw rows.
+
+    The independent queries run concurrently, each on its own pooled connection, but at most
+    ``CHAT_CONTEXT_MAX_CONNECTIONS`` at a time, so a burst of cold chats cannot exhaust the pool.
+    ``timings`` holds milliseconds per query (excluding the wait for a slot) and total.
+    """
+    timings: dict[str, float] = {}
+    slots = asyncio.Semaphore(max(1, settings.chat_context_max_connections))
+
+    async def timed(name: str, load: Callable[[AsyncSession, UUID], Awaitable[T]]) -> T:
+        async with slots:
+            started = time.perf_counter()
+            async with session_factory() as session:
+                result = await load(session, user_id)
+            timings[name] = (time.perf_counter() - started) * 1000
+        return result
+
+    started = time.perf_counter()
+    wallets, totals, monthly, (transactions, subcategories), budgets, goals = await asyncio.gather(
+        timed("wallets", wallet_totals),
+        timed("totals", type_totals),
+        timed("monthly", _load_monthly_totals),
+        timed("transactions", _load_recent_transactions),
+        timed("budgets", _load_budgets),
+        timed("goals", partial(goal_progress, period_start=date.today())),  # current and upcoming
     )
-    budget_subcategories = {sc.id: sc for sc in budget_subcategories_result.scalars().all()}
-    
-    # Fetch goals
-    goals_result = await db.execute(
-        select(Goal).where(Goal.user_id == user_id)
+    timings["total"] = (time.perf_counter() - started) * 1000
+    logger.info(
+        "Chat context loaded in %.1f ms (%s)",
+        timings["total"],
+        ", ".join(f"{name}={ms:.1f}ms" for name, ms in timings.items() if name != "total"),
     )
-    goals = list(goals_result.scalars().all())
-    
+
     return {
         "wallets": wallets,
+        "totals": totals,
+        "monthly": monthly,
         "transactions": transactions,
         "subcategories": subcategories,
         "budgets": budgets,
-        "budget_subcategories": budget_subcategories,
         "goals": goals,
+        "timings": timings,
     }
 
 
+def _server_timing(timings: dict[str, float]) -> str:
+    """Server-Timing header value, so the pre-model latency breakdown shows up in browser dev tools."""
+    return ", ".join(f"ctx-{name};dur={ms:.1f}" for name, ms in timings.items())
+
+
 COIN_BABY_SYSTEM_variation = """You are coinBaby - a baby who LOVES coins and saving money. Your personality:
 - Speak like a playful but smart toddler. Short sentences only.
 - Use baby/coin references SPARINGLY - 1 to 2 per response max. Let the actual info shine.
@@ -103,139 +165,576 @@ COIN_BABY_SYSTEM = """You are coinBaby applications financial assistant named Pe
 - Stay playful but actually helpful."""
 
 
-def _build_prompt(user_message: str, data: dict) -> tuple[str, str]:
-    """Build system + user prompts for Bedrock with user's financial data."""
+def _estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for English text and numbers)."""
+    return len(text) // 4 + 1
+
+
+def _fit_lines(lines: list[str], budget: int) -> tuple[list[str], int]:
+    """The leading lines that fit in ``budget`` tokens (plus a note on how many were cut), and the tokens left.
+
+    The note counts against the budget too, so lines are given back until it fits.
+    """
+    kept = []
+    for line in lines:
+        cost = _estimate_tokens(line)
+        if cost > budget:
+            break
+        kept.append(line)
+        budget -= cost
+    if len(kept) < len(lines):
+        while kept and _estimate_tokens(f"- ({len(lines) - len(kept)} more not shown)") > budget:
+            budget += _estimate_tokens(kept.pop())
+        note = f"- ({len(lines) - len(kept)} more not shown)"
+        if _estimate_tokens(note) <= budget:
+            kept.append(note)
+            budget -= _estimate_tokens(note)
+    return kept, budget
+
+
+# Shown for a section whose lines were all cut and that has no room left for the note
+_NOT_SHOWN = "- (not shown)"
+
+
+def _render_context(sections: list[tuple[str, str, list[str] | None]]) -> str:
+    """Context text from ``(heading, text if empty, lines)`` sections; ``None`` lines render the longest body
+    a section can have without lines, which is what the fixed part of the context is estimated with."""
+    parts = ["User financial data:"]
+    for heading, empty, lines in sections:
+        if lines is None:
+            body = max(empty, _NOT_SHOWN, key=len)
+        else:
+            body = "\n".join(lines) or empty
+        parts.append(f"{heading}\n{body}")
+    return "\n\n".join(parts)
 
-    # Format wallets
-    wallets_text = "\n".join([
-        f"- {w.name} (created {w.created_at.date()})"
-        for w in data["wallets"]
-    ]) or "No wallets."
 
-    # Format transactions
-    transactions_text = []
+def _build_context(data: dict, token_budget: int | None = None) -> str:
+    """Format the user's financial data as the context block sent after the system prompt.
+
+    Stays within ``token_budget`` (as estimated by ``_estimate_tokens``) unless the budget is
+    smaller than the section headings alone. Sections are filled in order of importance: wallet
+    balances, totals per type, budget and goal progress, then monthly per-category totals (at
+    most half of what is left) and the newest raw transactions. Lines that do not fit are
+    replaced by a note on how many were cut.
+    """
+    token_budget = settings.chat_context_token_budget if token_budget is None else token_budget
+
+    wallet_lines = [
+        f"- {w['name']}: {_format_cents_to_dollars(w['balance_cents'])} balance ({w['count']} transactions)"
+        for w in data["wallets"]
+    ]
+    total_lines = [
+        f"- {t['type']}: {_format_cents_to_dollars(t['total_cents'])} ({t['count']} transactions)"
+        for t in data["totals"]
+    ]
+    budget_lines = [
+        f"- {b['name']}: {_format_cents_to_dollars(b['limit_cents'])} limit, "
+        f"{_format_cents_to_dollars(b['spent_cents'])} spent ({b['percent_used']}%) "
+        f"({b['period_start']} to {b['period_end']})"
+        for b in data["budgets"]
+    ]
+    goal_lines = [
+        f"- {g['title']}: {_format_cents_to_dollars(g['target_cents'])} ({g['goal_type']}) "
+        f"{g['period_start']} to {g['period_end']}, "
+        f"{_format_cents_to_dollars(g['progress_cents'])} so far ({g['percent_complete']}%)"
+        for g in data["goals"]
+    ]
+    monthly_lines = [
+        f"- {m['month']:%Y-%m} {m['type']} {m['name']}: {_format_cents_to_dollars(m['total_cents'])} ({m['count']})"
+        for m in data["monthly"]
+    ]
+    transaction_lines = []
     for tx in data["transactions"]:
         subcategory = data["subcategories"].get(tx.subcategory_id)
         category_name = subcategory.name if subcategory else "Unknown"
         amount = _format_cents_to_dollars(tx.amount_cents)
         desc = f" - {tx.description}" if tx.description else ""
-        transactions_text.append(
+        transaction_lines.append(
             f"- {tx.transaction_date}: {amount} ({tx.type.value}) {category_name}{desc}"
         )
-    transactions_text = "\n".join(transactions_text) or "No transactions."
 
-    # Format budgets
-    budgets_text = []
-    for budget in data["budgets"]:
-        subcategory = data["budget_subcategories"].get(budget.subcategory_id)
-        category_name = subcategory.name if subcategory else "Unknown"
-        limit = _format_cents_to_dollars(budget.limit_cents)
-        budgets_text.append(
-            f"- {category_name}: {limit} limit ({budget.period_start} to {budget.period_end})"
-        )
-    budgets_text = "\n".join(budgets_text) or "No budgets."
-
-    # Format goals
-    goals_text = []
-    for goal in data["goals"]:
-        target = _format_cents_to_dollars(goal.target_cents)
-        goals_text.append(
-            f"- {goal.title}: {target} ({goal.goal_type.value}) {goal.period_start} to {goal.period_end}"
-        )
-    goals_text = "\n".join(goals_text) or "No goals."
+    sections = [
+        ("Wallets (balance = income minus all other transactions):", "No wallets.", wallet_lines),
+        ("All-time totals by type:", "No transactions.", total_lines),
+        ("Budgets (current periods):", "No budgets.", budget_lines),
+        ("Goals (current and upcoming):", "No goals.", goal_lines),
+        (f"Monthly totals by category (last {settings.chat_context_months} months):", "None.", monthly_lines),
+        ("Recent transactions (newest first):", "No transactions.", transaction_lines),
+    ]
+    remaining = token_budget - _estimate_tokens(_render_context([(h, e, None) for h, e, _ in sections]))
+    fitted = []
+    for _, _, lines in sections[:4]:
+        kept, remaining = _fit_lines(lines, remaining)
+        fitted.append(kept)
+    # Monthly totals get at most half of what is left so some raw rows always make it in
+    half = max(remaining, 0) // 2
+    kept, unused = _fit_lines(monthly_lines, half)
+    fitted.append(kept)
+    kept, _ = _fit_lines(transaction_lines, remaining - half + unused)
+    fitted.append(kept)
 
-    user_turn = f"""User financial data:
+    return _render_context([
+        (heading, empty, kept or ([_NOT_SHOWN] if lines else []))
+        for (heading, empty, lines), kept in zip(sections, fitted)
+    ])
 
-Wallets:
-{wallets_text}
 
-Recent transactions (last 50):
-{transactions_text}
+def _question(user_message: str, summary: str = "") -> str:
+    earlier = f"Earlier in this conversation:\n{summary}\n\n" if summary else ""
+    return f"{earlier}User question: {user_message}"
 
-Budgets:
-{budgets_text}
 
-Goals:
-{goals_text}
+def _build_prompt(user_message: str, summary: str = "") -> tuple[str, str]:
+    """Build system + user prompts for Bedrock. The financial context goes after the system prompt."""
+    return COIN_BABY_SYSTEM, _question(user_message, summary)
 
-User question: {user_message}"""
 
-    return COIN_BABY_SYSTEM, user_turn
+def _full_prompt(system_prompt: str, context: str, user_turn: str, history: list[ChatMessage]) -> str:
+    """Everything sent to the model, as returned to the client for transparency."""
+    turns = "".join(f"[{m.role.upper()}]\n{m.content}\n\n" for m in history)
+    return f"[SYSTEM]\n{system_prompt}\n\n{context}\n\n{turns}[USER]\n{user_turn}"
 
 
-async def _invoke_bedrock(system_prompt: str, user_message: str) -> str:
-    """Call Amazon Bedrock with the prompt and return the AI's response."""
+# user_id -> (data version, formatted context)
+_contexts = TTLCache(maxsize=settings.chat_context_cache_size, ttl_seconds=settings.chat_context_cache_ttl_seconds)
 
-    model_id = "global.anthropic.claude-haiku-4-5-20251001-v1:0"
-    logger.info(f"Invoking Bedrock with model: {model_id}")
 
-    try:
-        bedrock = boto3.client('bedrock-runtime', region_name='us-east-1')
-
-        payload = {
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 350,
-            "system": system_prompt,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": user_message
-                }
-            ]
-        }
-        
-        response = bedrock.invoke_model(
-            modelId=model_id,
-            body=json.dumps(payload)
+async def _get_context(
+    session_factory: async_sessionmaker[AsyncSession], user_id: UUID
+) -> tuple[int, str, str]:
+    """The user's data version, formatted financial context and a Server-Timing value.
+
+    Reused while the user's data version is unchanged, so consecutive chat turns do no DB work.
+    The version is read before loading: a write committed meanwhile bumps it, and the entry
+    stored here is then already stale instead of hiding that write.
+    """
+    version = data_versions.get(user_id)
+    cached = _contexts.get(user_id)
+    if cached is not None and cached[0] == version:
+        return version, cached[1], "ctx-cache;desc=hit"
+    data = await _fetch_user_financial_data(session_factory, user_id)
+    context = _build_context(data)
+    _contexts.set(user_id, (version, context))
+    return version, context, _server_timing(data["timings"])
+
+
+# (user_id, data version, normalized message, prompt hash, model id) -> reply
+_replies = TTLCache(maxsize=settings.chat_response_cache_size, ttl_seconds=settings.chat_response_cache_ttl_seconds)
+
+
+def _normalize_message(message: str) -> str:
+    """Case- and whitespace-insensitive form of a question, ignoring trailing punctuation."""
+    return " ".join(message.casefold().split()).rstrip("?!. ")
+
+
+def _reply_key(user_id: UUID, version: int, message: str, system_prompt: str, context: str, model_id: str) -> tuple:
+    """Response cache key. The hash covers everything sent besides the question itself, which is
+    keyed in normalized form so trivially different spellings of a question share a reply."""
+    digest = hashlib.sha256(f"{system_prompt}\0{context}".encode()).hexdigest()
+    return (user_id, version, _normalize_message(message), digest, model_id)
+
+
+def _bedrock_payload(
+    system_prompt: str,
+    context: str,
+    user_message: str,
+    summary: str = "",
+    history: Sequence[ChatMessage] = (),
+) -> dict:
+    """Anthropic Messages body for one chat turn.
+
+    The financial context follows the static system prompt in ``system``, ahead of everything
+    that changes from turn to turn: earlier turns still inside the history window (as plain
+    messages), then the question with the ``summary`` of older ones. With
+    ``BEDROCK_PROMPT_CACHING`` on, one cache breakpoint ends that prefix, so every turn on
+    unchanged data, in any session, can read it from the cache. Bedrock only caches a prefix of
+    at least the model's minimum length (2048 tokens or more for Claude Haiku models), which the
+    default ``CHAT_CONTEXT_TOKEN_BUDGET`` does not reach; shorter prefixes are billed as normal
+    input.
+    """
+    if not settings.bedrock_prompt_caching:
+        system = f"{system_prompt}\n\n{context}"
+    else:
+        system = [
+            {"type": "text", "text": system_prompt},
+            {"type": "text", "text": context, "cache_control": {"type": "ephemeral"}},
+        ]
+    return {
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": settings.bedrock_max_tokens,
+        "system": system,
+        "messages": [
+            *({"role": m.role, "content": m.content} for m in history),
+            {
+                "role": "user",
+                "content": _question(user_message, summary)
+            }
+        ]
+    }
+
+
+# Server-Timing metric -> Anthropic usage field
+_USAGE_METRICS = {
+    "tokens-input": "input_tokens",
+    "tokens-cache-read": "cache_read_input_tokens",
+    "tokens-cache-write": "cache_creation_input_tokens",
+    "tokens-output": "output_tokens",
+}
+
+
+def _log_usage(model_id: str, usage: dict | None) -> None:
+    """Log the token usage of one Bedrock call, including prompt-cache reads and writes."""
+    if not usage:
+        return
+    logger.info(
+        "Bedrock usage (%s): input=%d cache_read=%d cache_write=%d output=%d",
+        model_id,
+        *(usage.get(field, 0) for field in _USAGE_METRICS.values()),
+    )
+
+
+def _usage_timing(usage: dict | None) -> str:
+    """Server-Timing entries with the token counts of a Bedrock call, so prompt-cache hits can be checked."""
+    return ", ".join(f"{name};desc={(usage or {}).get(field, 0)}" for name, field in _USAGE_METRICS.items())
+
+
+def _usage_counts(usage: dict | None) -> dict[str, int]:
+    """The same token counts for the ``done`` event of a stream, whose headers are already sent."""
+    return {field: (usage or {}).get(field, 0) for field in _USAGE_METRICS.values()}
+
+
+def _bedrock_http_error(e: ClientError) -> HTTPException:
+    """Log a Bedrock ClientError and map it to the HTTP error returned to the client."""
+    error_code = e.response['Error']['Code']
+    error_msg = e.response['Error'].get('Message', str(e))
+    logger.error(f"Bedrock ClientError: {error_code} - {error_msg}")
+    logger.error(f"Full error response: {e.response}")
+
+    if error_code == 'AccessDeniedException':
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="AI service is not configured. Please contact support."
         )
-        
-        result = json.loads(response['body'].read())
+    elif error_code == 'ThrottlingException':
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests. Please try again in a moment."
+        )
+    else:
+        return HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"AI service error: {error_code}"
+        )
+
+
+async def _invoke_bedrock(bedrock: BedrockClient, payload: dict) -> tuple[str, dict | None]:
+    """Call Amazon Bedrock with the prompt and return the AI's response and token usage."""
+
+    logger.info(f"Invoking Bedrock with model: {bedrock.model_id}")
+
+    try:
+        result = await bedrock.invoke(payload)
         ai_reply = result['content'][0]['text']
         
         logger.info(f"Bedrock response received, length: {len(ai_reply)}")
-        return ai_reply
+        _log_usage(bedrock.model_id, result.get("usage"))
+        return ai_reply, result.get("usage")
         
     except ClientError as e:
-        error_code = e.response['Error']['Code']
-        error_msg = e.response['Error'].get('Message', str(e))
-        logger.error(f"Bedrock ClientError: {error_code} - {error_msg}")
-        logger.error(f"Full error response: {e.response}")
-        
-        if error_code == 'AccessDeniedException':
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="AI service is not configured. Please contact support."
-            )
-        elif error_code == 'ThrottlingException':
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Too many requests. Please try again in a moment."
-            )
+        raise _bedrock_http_error(e)
+
+
+async def _get_chat_session_or_404(db: AsyncSession, id: UUID, user_id: UUID, for_update: bool = False) -> ChatSession:
+    q = select(ChatSession).where(ChatSession.id == id, ChatSession.user_id == user_id)
+    if for_update:
+        q = q.with_for_update()
+    chat_session = (await db.execute(q)).scalar_one_or_none()
+    if not chat_session:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chat session not found")
+    return chat_session
+
+
+async def _load_history(
+    session_factory: async_sessionmaker[AsyncSession], user_id: UUID, session_id: UUID | None
+) -> tuple[str, list[ChatMessage]]:
+    """Summary and the messages still inside the history window of one of the user's chat sessions."""
+    if session_id is None:
+        return "", []
+    async with session_factory() as db:
+        chat_session = await _get_chat_session_or_404(db, session_id, user_id)
+        result = await db.execute(
+            select(ChatMessage)
+            .where(ChatMessage.session_id == chat_session.id, ChatMessage.position >= chat_session.summarized_count)
+            .order_by(ChatMessage.position)
+        )
+        return chat_session.summary, list(result.scalars().all())
+
+
+def _clip(text: str, limit: int = 160) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+async def _fold_history(db: AsyncSession, chat_session: ChatSession) -> None:
+    """Move the oldest turns that fell out of the history window into the session summary.
+
+    The summary is extractive (one clipped question/answer line per turn, no model call) and
+    keeps only the newest lines that fit in ``CHAT_HISTORY_SUMMARY_CHARS``.
+    """
+    overflow = chat_session.message_count - chat_session.summarized_count - settings.chat_history_messages
+    overflow -= overflow % 2  # whole question/answer pairs, so the window always starts with a user turn
+    if overflow <= 0:
+        return
+    start = chat_session.summarized_count
+    result = await db.execute(
+        select(ChatMessage.content)
+        .where(
+            ChatMessage.session_id == chat_session.id,
+            ChatMessage.position >= start,
+            ChatMessage.position < start + overflow,
+        )
+        .order_by(ChatMessage.position)
+    )
+    contents = list(result.scalars().all())
+    lines = chat_session.summary.splitlines()
+    lines += [f"- Q: {_clip(q)} / A: {_clip(a)}" for q, a in zip(contents[::2], contents[1::2])]
+    while lines and len("\n".join(lines)) > settings.chat_history_summary_chars:
+        lines.pop(0)
+    chat_session.summary = "\n".join(lines)
+    chat_session.summarized_count = start + overflow
+
+
+async def _save_turn(
+    session_factory: async_sessionmaker[AsyncSession],
+    user_id: UUID,
+    session_id: UUID | None,
+    message: str,
+    reply: str,
+) -> UUID:
+    """Append a question/answer pair to the chat session (creating it if needed); returns its id.
+
+    Runs after the model call, so no connection is held while Bedrock generates. The session
+    row is locked so concurrent turns in one session get distinct positions.
+    """
+    async with session_factory() as db:
+        if session_id is None:
+            chat_session = ChatSession(user_id=user_id, title=_clip(message, 80), summary="")
+            db.add(chat_session)
+            await db.flush()
         else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"AI service error: {error_code}"
-            )
+            chat_session = await _get_chat_session_or_404(db, session_id, user_id, for_update=True)
+        position = chat_session.message_count
+        db.add_all([
+            ChatMessage(session_id=chat_session.id, position=position, role="user", content=message),
+            ChatMessage(session_id=chat_session.id, position=position + 1, role="assistant", content=reply),
+        ])
+        chat_session.message_count = position + 2
+        chat_session.updated_at = datetime.utcnow()
+        await _fold_history(db, chat_session)
+        await db.commit()
+        return chat_session.id
+
+
+def _delta_text(event: dict) -> str | None:
+    """Text carried by an Anthropic stream event, if any."""
+    if event.get("type") == "content_block_delta" and event["delta"].get("type") == "text_delta":
+        return event["delta"]["text"]
+    return None
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class _BedrockStreamResponse(StreamingResponse):
+    """Server-Sent Events relaying a Bedrock stream, which is closed however the response ends.
+
+    The stream is opened before the response starts, so errors before the first chunk are plain
+    HTTP errors. If the client goes away before the body is iterated, nothing else would close
+    it, and the reader thread would keep reading the Bedrock stream.
+    """
+
+    def __init__(self, content: AsyncIterator[str], events: AsyncIterator[dict], headers: dict):
+        super().__init__(content, media_type="text/event-stream", headers=headers)
+        self.events = events
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.events.aclose()
 
 
 @router.post("", response_model=ChatResponse)
 async def chat(
     body: ChatRequest,
+    response: Response,
     user_id: UUID = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+    read_session_factory: async_sessionmaker[AsyncSession] = Depends(get_read_session_factory),
+    bedrock: BedrockClient = Depends(get_bedrock_client),
 ):
     """
     Chat endpoint that uses Amazon Bedrock to answer questions about user's finances.
     """
     
-    # Fetch user's financial data
-    data = await _fetch_user_financial_data(db, user_id)
-    
+    # Fetch user's financial context (cached until their data changes; read from the replica) and the session
+    # history (from the primary, which has the previous turn)
+    (version, context, timing), (summary, history) = await asyncio.gather(
+        _get_context(read_session_factory, user_id),
+        _load_history(session_factory, user_id, body.session_id),
+    )
+
     # Build prompt with data
-    system_prompt, user_turn = _build_prompt(body.message, data)
+    system_prompt, user_turn = _build_prompt(body.message, summary)
+
+    # Same question on unchanged data (and no earlier turns to answer in light of): reuse the earlier reply
+    key = None
+    if not summary and not history:
+        key = _reply_key(user_id, version, body.message, system_prompt, context, bedrock.model_id)
+    ai_reply = _replies.get(key) if key else None
+    if ai_reply is None:
+        payload = _bedrock_payload(system_prompt, context, body.message, summary, history)
+        ai_reply, usage = await _invoke_bedrock(bedrock, payload)
+        timing = f"{timing}, {_usage_timing(usage)}"
+        if key:
+            _replies.set(key, ai_reply)
+    else:
+        timing = f"{timing}, reply-cache;desc=hit"
+    response.headers["Server-Timing"] = timing
+
+    session_id = await _save_turn(session_factory, user_id, body.session_id, body.message, ai_reply)
+    full_prompt = _full_prompt(system_prompt, context, user_turn, history)
+    return ChatResponse(reply=ai_reply, prompt=full_prompt, session_id=session_id)
+
+
+@router.post("/stream")
+async def chat_stream(
+    body: ChatRequest,
+    user_id: UUID = Depends(get_current_user_id),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+    read_session_factory: async_sessionmaker[AsyncSession] = Depends(get_read_session_factory),
+    bedrock: BedrockClient = Depends(get_bedrock_client),
+):
+    """
+    Same as POST /chat, but forwards the reply as Server-Sent Events while the model generates it.
+
+    Events: `delta` ({"text"}) per chunk, then `done` ({"reply", "prompt", "session_id"}, plus the
+    token `usage` of the Bedrock call), or `error` ({"detail"}) if Bedrock fails mid-stream or
+    returns no text (such a turn is neither stored nor cached). Errors before the first chunk are
+    returned as normal HTTP errors. A cached reply is sent as a single `delta`.
+    """
+    (version, context, timing), (summary, history) = await asyncio.gather(
+        _get_context(read_session_factory, user_id),
+        _load_history(session_factory, user_id, body.session_id),
+    )
+    system_prompt, user_turn = _build_prompt(body.message, summary)
+    full_prompt = _full_prompt(system_prompt, context, user_turn, history)
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Server-Timing": timing}
+
+    async def done(reply: str, usage: dict | None = None) -> str:
+        try:
+            session_id = await _save_turn(session_factory, user_id, body.session_id, body.message, reply)
+        except HTTPException as e:
+            return _sse("error", {"detail": e.detail})
+        data = {"reply": reply, "prompt": full_prompt, "session_id": str(session_id)}
+        if usage is not None:
+            data["usage"] = _usage_counts(usage)
+        return _sse("done", data)
+
+    key = None
+    if not summary and not history:
+        key = _reply_key(user_id, version, body.message, system_prompt, context, bedrock.model_id)
+    cached_reply = _replies.get(key) if key else None
+    if cached_reply is not None:
+        async def replay():
+            yield _sse("delta", {"text": cached_reply})
+            yield await done(cached_reply)
+
+        headers["Server-Timing"] = f"{timing}, reply-cache;desc=hit"
+        return StreamingResponse(replay(), media_type="text/event-stream", headers=headers)
+
+    logger.info(f"Streaming Bedrock response with model: {bedrock.model_id}")
+    events = bedrock.stream(_bedrock_payload(system_prompt, context, body.message, summary, history))
+    try:
+        first = await anext(events)
+    except ClientError as e:
+        raise _bedrock_http_error(e)
+    except StopAsyncIteration:
+        first = None
+
+    async def relay():
+        if first is not None:
+            yield first
+            async for event in events:
+                yield event
+
+    async def sse():
+        parts: list[str] = []
+        usage: dict = {}
+        try:
+            async for event in relay():
+                # Input and cache token counts arrive in message_start, the output count in message_delta
+                if event.get("type") == "message_start":
+                    usage.update(event["message"].get("usage", {}))
+                elif event.get("type") == "message_delta":
+                    usage.update(event.get("usage", {}))
+                text = _delta_text(event)
+                if text:
+                    parts.append(text)
+                    yield _sse("delta", {"text": text})
+        except ClientError as e:
+            yield _sse("error", {"detail": _bedrock_http_error(e).detail})
+            return
+        finally:
+            await events.aclose()
+        _log_usage(bedrock.model_id, usage)
+        reply = "".join(parts)
+        if not reply:
+            yield _sse("error", {"detail": "AI service returned an empty reply"})
+            return
+        if key:
+            _replies.set(key, reply)
+        yield await done(reply, usage)
+
+    return _BedrockStreamResponse(sse(), events, headers)
+
+
+@router.get("/sessions", response_model=list[ChatSessionResponse])
+async def list_chat_sessions(
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db, scope="function"),
+):
+    result = await db.execute(
+        select(ChatSession).where(ChatSession.user_id == user_id).order_by(ChatSession.updated_at.desc())
+    )
+    return list(result.scalars().all())
 
-    # Call Bedrock
-    ai_reply = await _invoke_bedrock(system_prompt, user_turn)
 
-    full_prompt = f"[SYSTEM]\n{system_prompt}\n\n[USER]\n{user_turn}"
-    return ChatResponse(reply=ai_reply, prompt=full_prompt)
+@router.get("/sessions/{id}", response_model=ChatSessionDetailResponse)
+async def get_chat_session(
+    id: UUID,
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db, scope="function"),
+):
+    chat_session = await _get_chat_session_or_404(db, id, user_id)
+    result = await db.execute(
+        select(ChatMessage).where(ChatMessage.session_id == id).order_by(ChatMessage.position)
+    )
+    return ChatSessionDetailResponse(
+        **ChatSessionResponse.model_validate(chat_session).model_dump(),
+        summary=chat_session.summary,
+        messages=list(result.scalars().all()),
+    )
+
+
+@router.delete("/sessions/{id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_chat_session(
+    id: UUID,
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db, scope="function"),
+):
+    chat_session = await _get_chat_session_or_404(db, id, user_id)
+    await db.delete(chat_session)
+    return None
@@ -1,16 +1,22 @@
-"""Demo data loader for testing the AI chat feature."""
-import enum
-from datetime import date, timedelta
+"""Demo data loader for testing the AI chat feature, and a synthetic history generator for load tests."""
+import random
+import uuid
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+from typing import Iterator
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import delete, select
+from sqlalchemy import delete, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth import get_current_user_id
+from app.bulk import copy_records
+from app.cache import mark_data_changed
+from app.config import settings
 from app.database import get_db
-from app.models import Budget, Goal, Subcategory, Transaction, TransactionTypeEnum, Wallet
-from app.schemas import DemoLoadRequest, DemoLoadResponse
+from app.models import Subcategory, Transaction, Wallet
+from app.schemas import DemoLoadRequest, DemoLoadResponse, DemoSyntheticRequest, DemoSyntheticResponse
 
 router = APIRouter(prefix="/demo", tags=["demo"])
 
@@ -177,15 +183,114 @@ PROFILE_LABELS = {
 }
 
 
+_COLUMNS = ("id", "wallet_id", "type", "subcategory_id", "amount_cents", "description", "tags", "transaction_date", "created_at")
+_SYNTHETIC_BATCH_SIZE = 10000
+_SYNTHETIC_WALLET_PREFIX = "Synthetic Wallet"
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+async def _system_subcategories(db: AsyncSession) -> dict[tuple[str, str], UUID]:
+    """(type, name) -> id of the system subcategories the profiles refer to."""
+    result = await db.execute(
+        select(Subcategory.transaction_type, Subcategory.name, Subcategory.id).where(
+            Subcategory.user_id.is_(None), Subcategory.is_system.is_(True)
+        )
+    )
+    return {(tx_type.value, name): id for tx_type, name, id in result}
+
+
+def _profile_records(
+    raw_transactions: list[tuple], wallet_id: UUID, subcategories: dict[tuple[str, str], UUID]
+) -> list[tuple]:
+    """COPY records (``_COLUMNS`` order) for a profile; entries without a seeded subcategory are skipped."""
+    created_at = datetime.utcnow()
+    return [
+        (uuid.uuid4(), wallet_id, tx_type, subcategories[(tx_type, sc_name)], amount_cents, description, "[]",
+         _d(days_ago), created_at)
+        for tx_type, sc_name, amount_cents, description, days_ago in raw_transactions
+        if (tx_type, sc_name) in subcategories
+    ]
+
+
+def synthetic_records(
+    seed: int,
+    count: int,
+    wallet_ids: list[UUID],
+    subcategories: dict[tuple[str, str], UUID],
+    days: int,
+    end: date = _TODAY,
+) -> Iterator[tuple]:
+    """``count`` COPY records drawn from the profile entries, the same for the same ``seed``.
+
+    Each record copies a random profile entry, scales its amount by 0.6-1.4 and places it on a
+    random day in the ``days`` before ``end``. Ids are fresh uuid4s (so the same seed can be
+    loaded for several users); everything else, created_at included, depends only on the seed.
+    """
+    # Lookups are precomputed and picks use rng.random() directly: this loop runs up to a million times.
+    rng = random.Random(seed)
+    random_ = rng.random
+    templates = [
+        (tx_type, subcategories[(tx_type, sc_name)], amount_cents, description)
+        for entries in PROFILES.values()
+        for tx_type, sc_name, amount_cents, description, _ in entries
+        if (tx_type, sc_name) in subcategories
+    ]
+    dates = [end - timedelta(days=n) for n in range(days)]
+    midnights = [datetime.combine(day, time()) for day in dates]
+    for _ in range(count):
+        tx_type, subcategory_id, amount_cents, description = templates[int(random_() * len(templates))]
+        n = int(random_() * days)
+        yield (
+            uuid.uuid4(),
+            wallet_ids[int(random_() * len(wallet_ids))],
+            tx_type,
+            subcategory_id,
+            max(1, round(amount_cents * (0.6 + 0.8 * random_()))),
+            description,
+            "[]",
+            dates[n],
+            midnights[n] + timedelta(seconds=int(random_() * 86400)),
+        )
+
+
+async def load_synthetic_history(
+    db: AsyncSession, user_id: UUID, transactions: int, wallets: int, seed: int, days: int
+) -> tuple[list[UUID], int]:
+    """Replace the user's synthetic wallets with ``wallets`` new ones holding ``transactions`` generated rows.
+
+    Earlier synthetic wallets are found by ``Wallet.is_synthetic``, not by name, so a wallet the
+    user named "Synthetic Wallet 1" is left alone. Rows are written with COPY in batches; the
+    caller commits. Returns the wallet ids and rows written.
+    """
+    mark_data_changed(db, user_id)
+    await db.execute(delete(Wallet).where(Wallet.user_id == user_id, Wallet.is_synthetic.is_(True)))
+    result = await db.execute(
+        insert(Wallet).returning(Wallet.id),
+        [
+            {"user_id": user_id, "name": f"{_SYNTHETIC_WALLET_PREFIX} {i + 1}", "is_synthetic": True}
+            for i in range(wallets)
+        ],
+    )
+    wallet_ids = list(result.scalars())
+    records = synthetic_records(seed, transactions, wallet_ids, await _system_subcategories(db), days)
+    loaded = 0
+    while batch := list(islice(records, _SYNTHETIC_BATCH_SIZE)):
+        loaded += await copy_records(db, "transactions", _COLUMNS, batch)
+    return wallet_ids, loaded
+
+
 # ---------------------------------------------------------------------------
-# Endpoint
+# Endpoints
 # ---------------------------------------------------------------------------
 
 @router.post("", response_model=DemoLoadResponse)
 async def load_demo_profile(
     body: DemoLoadRequest,
     user_id: UUID = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ):
     """
     Clear the user's existing transactions and load a demo profile.
@@ -195,50 +300,19 @@ async def load_demo_profile(
     if profile_key not in PROFILES:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown profile")
 
-    raw_transactions = PROFILES[profile_key]
+    mark_data_changed(db, user_id)
 
     # Find or create demo wallet
-    wallet_result = await db.execute(
-        select(Wallet).where(Wallet.user_id == user_id, Wallet.name == "Demo Wallet")
-    )
-    wallet = wallet_result.scalar_one_or_none()
-    if wallet is None:
-        wallet = Wallet(user_id=user_id, name="Demo Wallet")
-        db.add(wallet)
-        await db.flush()
-        await db.refresh(wallet)
+    wallet_id = await db.scalar(select(Wallet.id).where(Wallet.user_id == user_id, Wallet.name == "Demo Wallet"))
+    if wallet_id is None:
+        wallet_id = await db.scalar(insert(Wallet).values(user_id=user_id, name="Demo Wallet").returning(Wallet.id))
 
     # Delete existing transactions in the demo wallet
-    await db.execute(
-        delete(Transaction).where(Transaction.wallet_id == wallet.id)
-    )
+    await db.execute(delete(Transaction).where(Transaction.wallet_id == wallet_id))
 
-    # Load system subcategories into a lookup map
-    sc_result = await db.execute(
-        select(Subcategory).where(Subcategory.user_id.is_(None), Subcategory.is_system.is_(True))
-    )
-    subcategories: dict[tuple[str, str], UUID] = {}
-    for sc in sc_result.scalars().all():
-        subcategories[(sc.transaction_type.value, sc.name)] = sc.id
-
-    # Insert profile transactions
-    inserted = 0
-    for tx_type_str, sc_name, amount_cents, description, days_ago in raw_transactions:
-        key = (tx_type_str, sc_name)
-        sc_id = subcategories.get(key)
-        if sc_id is None:
-            continue
-        tx = Transaction(
-            wallet_id=wallet.id,
-            type=TransactionTypeEnum(tx_type_str),
-            subcategory_id=sc_id,
-            amount_cents=amount_cents,
-            description=description,
-            tags=[],
-            transaction_date=_d(days_ago),
-        )
-        db.add(tx)
-        inserted += 1
+    # Insert profile transactions in one COPY
+    records = _profile_records(PROFILES[profile_key], wallet_id, await _system_subcategories(db))
+    inserted = await copy_records(db, "transactions", _COLUMNS, records)
 
     await db.commit()
 
@@ -246,5 +320,23 @@ async def load_demo_profile(
         profile=profile_key,
         label=PROFILE_LABELS[profile_key],
         transactions_loaded=inserted,
-        wallet_id=wallet.id,
+        wallet_id=wallet_id,
+    )
+
+
+@router.post("/synthetic", response_model=DemoSyntheticResponse)
+async def load_synthetic(
+    body: DemoSyntheticRequest,
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db, scope="function"),
+):
+    """Generate a deterministic history of any size (for load tests), replacing earlier synthetic wallets.
+
+    Only available with ``DEMO_SYNTHETIC_ENABLED``; otherwise use ``scripts/generate_synthetic.py``.
+    """
+    if not settings.demo_synthetic_enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    wallet_ids, loaded = await load_synthetic_history(
+        db, user_id, body.transactions, body.wallets, body.seed, body.days
     )
+    return DemoSyntheticResponse(transactions_loaded=loaded, wallet_ids=wallet_ids, seed=body.seed)
@@ -2,13 +2,16 @@ from datetime import date
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select
+from sqlalchemy import insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.aggregates import goal_progress
 from app.auth import get_current_user_id
+from app.cache import mark_data_changed
 from app.database import get_db
+from app.deps import get_read_db
 from app.models import Goal, TransactionTypeEnum
-from app.schemas import GoalCreate, GoalResponse, GoalUpdate, TransactionType
+from app.schemas import GoalCreate, GoalProgressResponse, GoalResponse, GoalUpdate, TransactionType
 
 router = APIRouter(prefix="/goals", tags=["goals"])
 
@@ -38,7 +41,7 @@ async def list_goals(
     period_start: date | None = Query(None),
     period_end: date | None = Query(None),
     user_id: UUID = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
 ):
     q = select(Goal).where(Goal.user_id == user_id)
     if period_start is not None:
@@ -49,14 +52,25 @@ async def list_goals(
     return list(result.scalars().all())
 
 
+@router.get("/progress", response_model=list[GoalProgressResponse])
+async def list_goal_progress(
+    period_start: date | None = Query(None),
+    period_end: date | None = Query(None),
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+):
+    """Goals with progress toward target, computed in a single grouped query."""
+    return await goal_progress(db, user_id, period_start, period_end)
+
+
 @router.post("", response_model=GoalResponse, status_code=status.HTTP_201_CREATED)
 async def create_goal(
     body: GoalCreate,
     user_id: UUID = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ):
     _validate_period(body.period_start, body.period_end)
-    g = Goal(
+    values = dict(
         user_id=user_id,
         title=body.title,
         target_cents=body.target_cents,
@@ -64,17 +78,15 @@ async def create_goal(
         period_start=body.period_start,
         period_end=body.period_end,
     )
-    db.add(g)
-    await db.flush()
-    await db.refresh(g)
-    return g
+    mark_data_changed(db, user_id)
+    return await db.scalar(insert(Goal).values(**values).returning(Goal))
 
 
 @router.get("/{id}", response_model=GoalResponse)
 async def get_goal(
     id: UUID,
     user_id: UUID = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
 ):
     return await _get_goal_or_404(db, id, user_id)
 
@@ -84,27 +96,26 @@ async def update_goal(
     id: UUID,
     body: GoalUpdate,
     user_id: UUID = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ):
-    g = await _get_goal_or_404(db, id, user_id)
-    if body.title is not None:
-        g.title = body.title
-    if body.target_cents is not None:
-        g.target_cents = body.target_cents
-    if body.goal_type is not None:
-        g.goal_type = _schema_type(body.goal_type)
+    values = body.model_dump(exclude_none=True)
+    if not values:
+        return await _get_goal_or_404(db, id, user_id)
+    if "goal_type" in values:
+        values["goal_type"] = _schema_type(body.goal_type)
+    q = update(Goal).where(Goal.id == id, Goal.user_id == user_id)
+    # A one-sided period change is checked against the stored other end in the same statement.
     if body.period_start is not None and body.period_end is not None:
         _validate_period(body.period_start, body.period_end)
-        g.period_start = body.period_start
-        g.period_end = body.period_end
     elif body.period_start is not None:
-        _validate_period(body.period_start, g.period_end)
-        g.period_start = body.period_start
+        q = q.where(Goal.period_end >= body.period_start)
     elif body.period_end is not None:
-        _validate_period(g.period_start, body.period_end)
-        g.period_end = body.period_end
-    await db.flush()
-    await db.refresh(g)
+        q = q.where(Goal.period_start <= body.period_end)
+    mark_data_changed(db, user_id)
+    g = await db.scalar(q.values(**values).returning(Goal))
+    if not g:
+        await _get_goal_or_404(db, id, user_id)  # 404 if missing; otherwise the period was rejected
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="period_end must be >= period_start")
     return g
 
 
@@ -112,8 +123,9 @@ async def update_goal(
 async def delete_goal(
     id: UUID,
     user_id: UUID = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ):
     g = await _get_goal_or_404(db, id, user_id)
+    mark_data_changed(db, user_id)
     await db.delete(g)
     return None
@@ -1,11 +1,13 @@
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import or_, select
+from sqlalchemy import insert, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth import get_current_user_id
+from app.cache import mark_data_changed
 from app.database import get_db
+from app.deps import get_read_db
 from app.models import Subcategory, TransactionTypeEnum
 from app.schemas import SubcategoryCreate, SubcategoryResponse, SubcategoryUpdate, TransactionType
 
@@ -28,7 +30,7 @@ async def _get_owned_subcategory_or_404(db: AsyncSession, id: UUID, user_id: UUI
 async def list_subcategories(
     type: TransactionType | None = Query(None, description="Filter by transaction type"),
     user_id: UUID = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
 ):
     q = select(Subcategory).where(or_(Subcategory.user_id.is_(None), Subcategory.user_id == user_id))
     if type is not None:
@@ -41,18 +43,19 @@ async def list_subcategories(
 async def create_subcategory(
     body: SubcategoryCreate,
     user_id: UUID = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ):
-    sub = Subcategory(
-        transaction_type=_schema_type(body.transaction_type),
-        name=body.name,
-        is_system=False,
-        user_id=user_id,
+    mark_data_changed(db, user_id)
+    return await db.scalar(
+        insert(Subcategory)
+        .values(
+            transaction_type=_schema_type(body.transaction_type),
+            name=body.name,
+            is_system=False,
+            user_id=user_id,
+        )
+        .returning(Subcategory)
     )
-    db.add(sub)
-    await db.flush()
-    await db.refresh(sub)
-    return sub
 
 
 @router.put("/{id}", response_model=SubcategoryResponse)
@@ -60,12 +63,17 @@ async def update_subcategory(
     id: UUID,
     body: SubcategoryUpdate,
     user_id: UUID = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ):
-    sub = await _get_owned_subcategory_or_404(db, id, user_id)
-    sub.name = body.name
-    await db.flush()
-    await db.refresh(sub)
+    mark_data_changed(db, user_id)
+    sub = await db.scalar(
+        update(Subcategory)
+        .where(Subcategory.id == id, Subcategory.user_id == user_id)
+        .values(name=body.name)
+        .returning(Subcategory)
+    )
+    if not sub:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Subcategory not found")
     return sub
 
 
@@ -73,8 +81,9 @@ async def update_subcategory(
 async def delete_subcategory(
     id: UUID,
     user_id: UUID = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ):
     sub = await _get_owned_subcategory_or_404(db, id, user_id)
+    mark_data_changed(db, user_id)
     await db.delete(sub)
     return None
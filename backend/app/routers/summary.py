@@ -0,0 +1,34 @@
+from datetime import date
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.aggregates import subcategory_totals, type_totals, wallet_totals
+from app.auth import get_current_user_id
+from app.deps import get_read_db
+from app.schemas import SummaryResponse
+
+router = APIRouter(prefix="/summary", tags=["summary"])
+
+
+@router.get("", response_model=SummaryResponse)
+async def get_summary(
+    date_from: date | None = Query(None),
+    date_to: date | None = Query(None),
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+):
+    """Per-type, per-wallet and per-subcategory totals for the window, aggregated in the database."""
+    if date_from is not None and date_to is not None and date_to < date_from:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_to must be >= date_from",
+        )
+    return SummaryResponse(
+        date_from=date_from,
+        date_to=date_to,
+        by_type=await type_totals(db, user_id, date_from, date_to),
+        by_wallet=await wallet_totals(db, user_id, date_from, date_to),
+        by_subcategory=await subcategory_totals(db, user_id, date_from, date_to),
+    )
@@ -1,17 +1,61 @@
-from datetime import date
+import base64
+import json
+import uuid
+from contextlib import aclosing
+from datetime import date, datetime
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, Text, cast, delete, insert, literal, or_, select, tuple_, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.auth import get_current_user_id
+from app.bulk import copy_query_out, copy_records
+from app.cache import mark_data_changed
 from app.database import get_db
-from app.models import Transaction, TransactionTypeEnum, Wallet
-from app.schemas import TransactionCreate, TransactionResponse, TransactionType, TransactionUpdate
+from app.deps import get_read_db, get_read_session_factory
+from app.exporters import COLUMNS as EXPORT_COLUMNS, ENCODERS, FORMATS as EXPORT_FORMATS, parquet_available
+from app.importers import FORMATS as IMPORT_FORMATS, PARSERS, ImportedRow
+from app.models import Subcategory, Transaction, TransactionTypeEnum, Wallet
+from app.schemas import (
+    ImportRowError,
+    TransactionBatchRequest,
+    TransactionBatchResponse,
+    TransactionCreate,
+    TransactionImportResponse,
+    TransactionPage,
+    TransactionResponse,
+    TransactionType,
+    TransactionUpdate,
+)
 
 router = APIRouter(prefix="/transactions", tags=["transactions"])
 
+# Newest first; id breaks ties so the order (and therefore the keyset cursor) is total.
+_ORDER_BY = (Transaction.transaction_date.desc(), Transaction.created_at.desc(), Transaction.id.desc())
+_STREAM_BATCH_SIZE = 500
+_EXPORT_BATCH_SIZE = 10000
+# Ids, type and tags come back as text (tags as their JSON): cheaper than decoding UUIDs and JSONB
+# only to re-encode them.
+_EXPORT_SELECT = tuple(
+    cast(column, Text).label(column.key) if column.key in ("id", "wallet_id", "type", "subcategory_id", "tags") else column
+    for column in (getattr(Transaction, name) for name in EXPORT_COLUMNS)
+)
+_IMPORT_BATCH_SIZE = 5000
+_IMPORT_MAX_ERRORS = 100
+_IMPORT_COLUMNS = (
+    "id", "wallet_id", "type", "subcategory_id", "amount_cents", "description", "tags", "transaction_date", "created_at",
+)
+_IMPORT_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/ofx": "ofx",
+    "application/x-ofx": "ofx",
+    "application/qif": "qif",
+    "application/x-qif": "qif",
+}
+
 
 def _schema_type(t: TransactionType) -> TransactionTypeEnum:
     return TransactionTypeEnum(t.value)
@@ -35,15 +79,27 @@ async def _get_transaction_owned_or_404(db: AsyncSession, id: UUID, user_id: UUI
     return tx
 
 
-@router.get("", response_model=list[TransactionResponse])
-async def list_transactions(
-    wallet_id: UUID | None = Query(None),
-    type: TransactionType | None = Query(None),
-    date_from: date | None = Query(None),
-    date_to: date | None = Query(None),
-    user_id: UUID = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
-):
+def _encode_cursor(tx: Transaction) -> str:
+    raw = json.dumps([tx.transaction_date.isoformat(), tx.created_at.isoformat(), str(tx.id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[date, datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        tx_date, created_at, tx_id = json.loads(base64.urlsafe_b64decode(padded))
+        return date.fromisoformat(tx_date), datetime.fromisoformat(created_at), UUID(tx_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def _filtered_transactions(
+    user_id: UUID,
+    wallet_id: UUID | None,
+    type: TransactionType | None,
+    date_from: date | None,
+    date_to: date | None,
+) -> Select:
     q = select(Transaction).join(Wallet).where(Wallet.user_id == user_id)
     if wallet_id is not None:
         q = q.where(Transaction.wallet_id == wallet_id)
@@ -53,30 +109,288 @@ async def list_transactions(
         q = q.where(Transaction.transaction_date >= date_from)
     if date_to is not None:
         q = q.where(Transaction.transaction_date <= date_to)
-    q = q.order_by(Transaction.transaction_date.desc(), Transaction.created_at.desc())
+    return q.order_by(*_ORDER_BY)
+
+
+@router.get("", response_model=list[TransactionResponse])
+async def list_transactions(
+    wallet_id: UUID | None = Query(None),
+    type: TransactionType | None = Query(None),
+    date_from: date | None = Query(None),
+    date_to: date | None = Query(None),
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+):
+    q = _filtered_transactions(user_id, wallet_id, type, date_from, date_to)
     result = await db.execute(q)
     return list(result.scalars().all())
 
 
+@router.get("/page", response_model=TransactionPage)
+async def list_transactions_page(
+    wallet_id: UUID | None = Query(None),
+    type: TransactionType | None = Query(None),
+    date_from: date | None = Query(None),
+    date_to: date | None = Query(None),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+):
+    """Keyset pagination on (transaction_date, created_at, id), newest first."""
+    q = _filtered_transactions(user_id, wallet_id, type, date_from, date_to)
+    if cursor is not None:
+        q = q.where(
+            tuple_(Transaction.transaction_date, Transaction.created_at, Transaction.id)
+            < tuple_(*_decode_cursor(cursor))
+        )
+    result = await db.execute(q.limit(limit + 1))
+    items = list(result.scalars().all())
+    next_cursor = _encode_cursor(items[limit - 1]) if len(items) > limit else None
+    return TransactionPage(items=items[:limit], next_cursor=next_cursor)
+
+
+@router.get("/stream")
+async def stream_transactions(
+    wallet_id: UUID | None = Query(None),
+    type: TransactionType | None = Query(None),
+    date_from: date | None = Query(None),
+    date_to: date | None = Query(None),
+    user_id: UUID = Depends(get_current_user_id),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_read_session_factory),
+):
+    """Stream every matching transaction as NDJSON from a server-side cursor.
+
+    The session lives inside the response body, so its connection is held only while rows are sent.
+    """
+    q = _filtered_transactions(user_id, wallet_id, type, date_from, date_to)
+
+    async def rows():
+        async with session_factory() as db:
+            result = await db.stream(q.execution_options(yield_per=_STREAM_BATCH_SIZE))
+            async for tx in result.scalars():
+                yield TransactionResponse.model_validate(tx).model_dump_json() + "\n"
+
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+
+@router.get("/export")
+async def export_transactions(
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet)$"),
+    wallet_id: UUID | None = Query(None),
+    type: TransactionType | None = Query(None),
+    date_from: date | None = Query(None),
+    date_to: date | None = Query(None),
+    user_id: UUID = Depends(get_current_user_id),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_read_session_factory),
+):
+    """Download matching transactions as CSV, NDJSON or Parquet without holding the result in memory.
+
+    CSV is produced by Postgres itself (``COPY ... TO STDOUT``); NDJSON and Parquet are encoded
+    batch by batch from a server-side cursor. The session lives inside the response body.
+    """
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="Parquet export requires pyarrow")
+    q = _filtered_transactions(user_id, wallet_id, type, date_from, date_to).with_only_columns(*_EXPORT_SELECT)
+
+    async def body():
+        async with session_factory() as db:
+            if format == "csv":
+                chunks = copy_query_out(db, q, format="csv", header=True)
+            else:
+                result = await db.stream(q.execution_options(yield_per=_EXPORT_BATCH_SIZE))
+                chunks = ENCODERS[format](result.partitions())
+            async with aclosing(chunks):
+                async for chunk in chunks:
+                    yield chunk
+
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="transactions.{extension}"'},
+    )
+
+
+async def _subcategory_ids(db: AsyncSession, user_id: UUID) -> dict[tuple[str, str], UUID]:
+    """(type, lowercased name) -> id for the system subcategories and the user's own (which win)."""
+    result = await db.execute(
+        select(Subcategory.id, Subcategory.transaction_type, Subcategory.name)
+        .where(or_(Subcategory.user_id.is_(None), Subcategory.user_id == user_id))
+        .order_by(Subcategory.user_id.nulls_first())
+    )
+    return {(t.value, name.lower()): id for id, t, name in result}
+
+
+def _import_record(
+    row: ImportedRow, wallet_id: UUID, subcategories: dict[tuple[str, str], UUID], created_at: datetime
+) -> tuple:
+    """COPY record for one parsed row. Without a type, the sign decides (negative is an expense);
+    without a subcategory, the type's "Other" is used."""
+    if row.amount_cents == 0:
+        raise ValueError("Amount must not be zero")
+    tx_type = row.type or ("expense" if row.amount_cents < 0 else "income")
+    if tx_type not in TransactionTypeEnum.__members__:
+        raise ValueError(f"Invalid type: {row.type!r}")
+    subcategory_id = subcategories.get((tx_type, (row.subcategory or "Other").lower()))
+    if subcategory_id is None:
+        raise ValueError(f"Unknown {tx_type} subcategory: {row.subcategory!r}")
+    return (
+        uuid.uuid4(),
+        wallet_id,
+        tx_type,
+        subcategory_id,
+        abs(row.amount_cents),
+        row.description,
+        "[]",
+        row.transaction_date,
+        created_at,
+    )
+
+
+@router.post("/import", response_model=TransactionImportResponse)
+async def import_transactions(
+    request: Request,
+    wallet_id: UUID,
+    format: str | None = Query(None, description="csv, ofx or qif; defaults from Content-Type"),
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db, scope="function"),
+):
+    """Bulk-import a bank statement sent as the raw request body into one wallet.
+
+    The upload is parsed as it streams in and written with COPY in batches of
+    ``_IMPORT_BATCH_SIZE``. Valid rows are imported; invalid ones are reported by row number.
+    """
+    if format is None:
+        format = _IMPORT_CONTENT_TYPES.get(request.headers.get("content-type", "").split(";")[0].strip().lower())
+    if format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown import format; pass ?format=csv|ofx|qif"
+        )
+    await _get_wallet_owned_or_404(db, wallet_id, user_id)
+    subcategories = await _subcategory_ids(db, user_id)
+    created_at = datetime.utcnow()
+
+    imported, failed, errors, batch = 0, 0, [], []
+    try:
+        async for number, row in PARSERS[format](request.stream()):
+            try:
+                if isinstance(row, str):
+                    raise ValueError(row)
+                batch.append(_import_record(row, wallet_id, subcategories, created_at))
+            except ValueError as e:
+                failed += 1
+                if len(errors) < _IMPORT_MAX_ERRORS:
+                    errors.append(ImportRowError(row=number, detail=str(e)))
+            if len(batch) >= _IMPORT_BATCH_SIZE:
+                imported += await copy_records(db, "transactions", _IMPORT_COLUMNS, batch)
+                batch = []
+    except ValueError as e:  # unreadable file (e.g. CSV without the required columns)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if batch:
+        imported += await copy_records(db, "transactions", _IMPORT_COLUMNS, batch)
+    if imported:
+        mark_data_changed(db, user_id)
+    return TransactionImportResponse(imported=imported, failed=failed, errors=errors)
+
+
+async def _check_batch_ownership(
+    db: AsyncSession, user_id: UUID, wallet_ids: set[UUID], transaction_ids: set[UUID]
+) -> None:
+    """404 unless every wallet and transaction belongs to the user; one round trip for the whole batch."""
+    if not wallet_ids and not transaction_ids:
+        return
+    checks = [select(literal("wallet").label("kind"), Wallet.id).where(Wallet.id.in_(wallet_ids), Wallet.user_id == user_id)]
+    if transaction_ids:
+        checks.append(
+            select(literal("transaction").label("kind"), Transaction.id)
+            .join(Wallet)
+            .where(Transaction.id.in_(transaction_ids), Wallet.user_id == user_id)
+        )
+    result = await db.execute(union_all(*checks))
+    found = {(kind, id) for kind, id in result}
+    if any(("wallet", id) not in found for id in wallet_ids):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Wallet not found")
+    if any(("transaction", id) not in found for id in transaction_ids):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transaction not found")
+
+
+@router.post("/batch", response_model=TransactionBatchResponse)
+async def batch_transactions(
+    body: TransactionBatchRequest,
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db, scope="function"),
+):
+    """Create, update and delete many transactions in one request and one DB transaction.
+
+    Ownership of every referenced wallet and transaction is checked up front; if any is missing
+    nothing is applied. Creates are one multi-row INSERT ... RETURNING, updates are executed as
+    a batch by primary key, deletes are one DELETE ... WHERE id IN (...).
+    """
+    update_ids = [u.id for u in body.update]
+    if len(set(update_ids)) != len(update_ids) or set(update_ids) & set(body.delete):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Each transaction may appear in only one operation"
+        )
+    await _check_batch_ownership(
+        db, user_id, {c.wallet_id for c in body.create}, set(update_ids) | set(body.delete)
+    )
+
+    created = []
+    if body.create:
+        rows = [{**c.model_dump(), "type": _schema_type(c.type)} for c in body.create]
+        # RETURNING from a multi-row insert is unordered unless asked; `created` follows the request
+        returning = insert(Transaction).returning(Transaction, sort_by_parameter_order=True)
+        created = list((await db.scalars(returning, rows)).all())
+
+    updated = []
+    if body.update:
+        rows = []
+        for u in body.update:
+            row = u.model_dump(exclude_none=True)
+            if "type" in row:
+                row["type"] = _schema_type(u.type)
+            if len(row) > 1:  # more than just the id
+                rows.append(row)
+        if rows:
+            await db.execute(update(Transaction), rows)
+        result = await db.execute(
+            select(Transaction).where(Transaction.id.in_(update_ids)).execution_options(populate_existing=True)
+        )
+        by_id = {tx.id: tx for tx in result.scalars()}
+        updated = [by_id[id] for id in update_ids]
+
+    if body.delete:
+        await db.execute(delete(Transaction).where(Transaction.id.in_(body.delete)))
+
+    if body.create or body.update or body.delete:
+        mark_data_changed(db, user_id)
+    return TransactionBatchResponse(created=created, updated=updated, deleted=body.delete)
+
+
 @router.post("", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
 async def create_transaction(
     body: TransactionCreate,
     user_id: UUID = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ):
-    await _get_wallet_owned_or_404(db, body.wallet_id, user_id)
-    tx = Transaction(
-        wallet_id=body.wallet_id,
-        type=_schema_type(body.type),
-        subcategory_id=body.subcategory_id,
-        amount_cents=body.amount_cents,
-        description=body.description,
-        tags=body.tags or [],
-        transaction_date=body.transaction_date,
+    values = {
+        "type": _schema_type(body.type),
+        "subcategory_id": body.subcategory_id,
+        "amount_cents": body.amount_cents,
+        "description": body.description,
+        "tags": body.tags or [],
+        "transaction_date": body.transaction_date,
+    }
+    columns = Transaction.__table__.c
+    # INSERT ... SELECT from the caller's wallet: the ownership check and the write are one statement.
+    owned_wallet = select(Wallet.id, *(literal(value, columns[name].type) for name, value in values.items())).where(
+        Wallet.id == body.wallet_id, Wallet.user_id == user_id
     )
-    db.add(tx)
-    await db.flush()
-    await db.refresh(tx)
+    mark_data_changed(db, user_id)
+    tx = await db.scalar(insert(Transaction).from_select(["wallet_id", *values], owned_wallet).returning(Transaction))
+    if not tx:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Wallet not found")
     return tx
 
 
@@ -84,7 +398,7 @@ async def create_transaction(
 async def get_transaction(
     id: UUID,
     user_id: UUID = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
 ):
     return await _get_transaction_owned_or_404(db, id, user_id)
 
@@ -94,23 +408,22 @@ async def update_transaction(
     id: UUID,
     body: TransactionUpdate,
     user_id: UUID = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ):
-    tx = await _get_transaction_owned_or_404(db, id, user_id)
-    if body.type is not None:
-        tx.type = _schema_type(body.type)
-    if body.subcategory_id is not None:
-        tx.subcategory_id = body.subcategory_id
-    if body.amount_cents is not None:
-        tx.amount_cents = body.amount_cents
-    if body.description is not None:
-        tx.description = body.description
-    if body.tags is not None:
-        tx.tags = body.tags
-    if body.transaction_date is not None:
-        tx.transaction_date = body.transaction_date
-    await db.flush()
-    await db.refresh(tx)
+    values = body.model_dump(exclude_none=True)
+    if not values:
+        return await _get_transaction_owned_or_404(db, id, user_id)
+    if "type" in values:
+        values["type"] = _schema_type(body.type)
+    mark_data_changed(db, user_id)
+    tx = await db.scalar(
+        update(Transaction)
+        .where(Transaction.id == id, Transaction.wallet_id.in_(select(Wallet.id).where(Wallet.user_id == user_id)))
+        .values(**values)
+        .returning(Transaction)
+    )
+    if not tx:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transaction not found")
     return tx
 
 
@@ -118,8 +431,9 @@ async def update_transaction(
 async def delete_transaction(
     id: UUID,
     user_id: UUID = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ):
     tx = await _get_transaction_owned_or_404(db, id, user_id)
+    mark_data_changed(db, user_id)
     await db.delete(tx)
     return None
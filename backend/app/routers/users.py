@@ -2,9 +2,10 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.auth import get_current_user_id, get_token_payload
+from app.auth import get_current_user_id, get_token_payload, invalidate_user_id
 from app.database import get_db
 from app.models import User
 from app.schemas import UserResponse, UserUpdate
@@ -15,7 +16,7 @@ router = APIRouter(prefix="/users", tags=["users"])
 @router.get("/me", response_model=UserResponse)
 async def get_me(
     user_id: UUID = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ):
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
@@ -28,22 +29,21 @@ async def get_me(
 async def upsert_me(
     body: UserUpdate,
     payload: dict = Depends(get_token_payload),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ):
     sub = payload.get("sub")
     if not sub:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing sub in token")
-    result = await db.execute(select(User).where(User.cognito_sub == sub))
-    user = result.scalar_one_or_none()
-    if user:
-        if body.email is not None:
-            user.email = body.email
-        await db.flush()
-        await db.refresh(user)
-        return user
+    invalidate_user_id(sub)
+    # One upsert: a new user takes the token's email unless one is given; an existing user's
+    # email only changes when one is given (the no-op update still lets RETURNING see the row).
     email = body.email if body.email is not None else payload.get("email")
-    user = User(cognito_sub=sub, email=email)
-    db.add(user)
-    await db.flush()
-    await db.refresh(user)
-    return user
+    return await db.scalar(
+        insert(User)
+        .values(cognito_sub=sub, email=email)
+        .on_conflict_do_update(
+            index_elements=[User.cognito_sub],
+            set_={"email": User.email if body.email is None else body.email},
+        )
+        .returning(User)
+    )
@@ -1,11 +1,13 @@
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth import get_current_user_id
+from app.cache import mark_data_changed
 from app.database import get_db
+from app.deps import get_read_db
 from app.models import Wallet
 from app.schemas import WalletCreate, WalletResponse, WalletUpdate
 
@@ -23,7 +25,7 @@ async def _get_wallet_or_404(db: AsyncSession, wallet_id: UUID, user_id: UUID) -
 @router.get("", response_model=list[WalletResponse])
 async def list_wallets(
     user_id: UUID = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
 ):
     result = await db.execute(select(Wallet).where(Wallet.user_id == user_id))
     return list(result.scalars().all())
@@ -33,20 +35,17 @@ async def list_wallets(
 async def create_wallet(
     body: WalletCreate,
     user_id: UUID = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ):
-    wallet = Wallet(user_id=user_id, name=body.name)
-    db.add(wallet)
-    await db.flush()
-    await db.refresh(wallet)
-    return wallet
+    mark_data_changed(db, user_id)
+    return await db.scalar(insert(Wallet).values(user_id=user_id, name=body.name).returning(Wallet))
 
 
 @router.get("/{id}", response_model=WalletResponse)
 async def get_wallet(
     id: UUID,
     user_id: UUID = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
 ):
     return await _get_wallet_or_404(db, id, user_id)
 
@@ -56,12 +55,14 @@ async def update_wallet(
     id: UUID,
     body: WalletUpdate,
     user_id: UUID = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ):
-    wallet = await _get_wallet_or_404(db, id, user_id)
-    wallet.name = body.name
-    await db.flush()
-    await db.refresh(wallet)
+    mark_data_changed(db, user_id)
+    wallet = await db.scalar(
+        update(Wallet).where(Wallet.id == id, Wallet.user_id == user_id).values(name=body.name).returning(Wallet)
+    )
+    if not wallet:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Wallet not found")
     return wallet
 
 
@@ -69,8 +70,9 @@ async def update_wallet(
 async def delete_wallet(
     id: UUID,
     user_id: UUID = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ):
     wallet = await _get_wallet_or_404(db, id, user_id)
+    mark_data_changed(db, user_id)
     await db.delete(wallet)
     return None
@@ -107,6 +107,38 @@ class TransactionResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class TransactionPage(BaseModel):
+    items: List[TransactionResponse]
+    next_cursor: Optional[str] = None
+
+
+class TransactionBatchUpdate(TransactionUpdate):
+    id: UUID
+
+
+class TransactionBatchRequest(BaseModel):
+    create: List[TransactionCreate] = Field(default_factory=list, max_length=1000)
+    update: List[TransactionBatchUpdate] = Field(default_factory=list, max_length=1000)
+    delete: List[UUID] = Field(default_factory=list, max_length=1000)
+
+
+class TransactionBatchResponse(BaseModel):
+    created: List[TransactionResponse]
+    updated: List[TransactionResponse]
+    deleted: List[UUID]
+
+
+class ImportRowError(BaseModel):
+    row: int
+    detail: str
+
+
+class TransactionImportResponse(BaseModel):
+    imported: int
+    failed: int
+    errors: List[ImportRowError] = Field(default_factory=list, description="First rows that failed (capped)")
+
+
 # ----- Budget -----
 class BudgetCreate(BaseModel):
     subcategory_id: UUID
@@ -134,6 +166,12 @@ class BudgetResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class BudgetProgressResponse(BudgetResponse):
+    spent_cents: int
+    remaining_cents: int
+    percent_used: float
+
+
 # ----- Goal -----
 class GoalCreate(BaseModel):
     title: str = Field(..., min_length=1, max_length=500)
@@ -164,14 +202,77 @@ class GoalResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class GoalProgressResponse(GoalResponse):
+    progress_cents: int
+    remaining_cents: int
+    percent_complete: float
+
+
+# ----- Summary -----
+class TypeTotal(BaseModel):
+    type: TransactionType
+    total_cents: int
+    count: int
+
+
+class WalletTotal(BaseModel):
+    wallet_id: UUID
+    name: str
+    inflow_cents: int
+    outflow_cents: int
+    balance_cents: int
+    count: int
+
+
+class SubcategoryTotal(BaseModel):
+    subcategory_id: UUID
+    name: str
+    type: TransactionType
+    total_cents: int
+    count: int
+
+
+class SummaryResponse(BaseModel):
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    by_type: List[TypeTotal]
+    by_wallet: List[WalletTotal]
+    by_subcategory: List[SubcategoryTotal]
+
+
 # ----- Chat -----
 class ChatRequest(BaseModel):
     message: str = Field(..., min_length=1)
+    session_id: UUID | None = Field(None, description="Continue this chat session; omit to start a new one")
 
 
 class ChatResponse(BaseModel):
     reply: str
     prompt: str | None = None
+    session_id: UUID | None = None
+
+
+class ChatSessionResponse(BaseModel):
+    id: UUID
+    title: str
+    message_count: int
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ChatMessageResponse(BaseModel):
+    role: str
+    content: str
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ChatSessionDetailResponse(ChatSessionResponse):
+    summary: str
+    messages: list[ChatMessageResponse]
 
 
 # ----- Demo -----
@@ -184,3 +285,16 @@ class DemoLoadResponse(BaseModel):
     label: str
     transactions_loaded: int
     wallet_id: UUID
+
+
+class DemoSyntheticRequest(BaseModel):
+    transactions: int = Field(10000, ge=1, le=1_000_000)
+    wallets: int = Field(3, ge=1, le=100)
+    seed: int = 0
+    days: int = Field(365, ge=1, le=3650, description="History length, ending at the demo date")
+
+
+class DemoSyntheticResponse(BaseModel):
+    transactions_loaded: int
+    wallet_ids: List[UUID]
+    seed: int
@@ -0,0 +1,95 @@
+"""Initial schema (what scripts.create_tables used to build with create_all).
+
+Databases created before migrations existed already have these tables;
+scripts.create_tables stamps them at this revision instead of re-creating them.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-03-05
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+transaction_type = postgresql.ENUM("income", "expense", "investment", "donation", name="transactiontypeenum")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("cognito_sub", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_users_cognito_sub", "users", ["cognito_sub"], unique=True)
+
+    op.create_table(
+        "wallets",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+
+    op.create_table(
+        "subcategories",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("transaction_type", transaction_type, nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("is_system", sa.Boolean(), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=True),
+        sa.UniqueConstraint("transaction_type", "name", "user_id", name="uq_subcategories_type_name_user"),
+    )
+
+    op.create_table(
+        "transactions",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("wallet_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("wallets.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("type", postgresql.ENUM(name="transactiontypeenum", create_type=False), nullable=False),
+        sa.Column("subcategory_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("subcategories.id"), nullable=False),
+        sa.Column("amount_cents", sa.BigInteger(), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("tags", postgresql.JSONB(), nullable=False),
+        sa.Column("transaction_date", sa.Date(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+
+    op.create_table(
+        "budgets",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("subcategory_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("subcategories.id"), nullable=False),
+        sa.Column("limit_cents", sa.BigInteger(), nullable=False),
+        sa.Column("period_start", sa.Date(), nullable=False),
+        sa.Column("period_end", sa.Date(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+
+    op.create_table(
+        "goals",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("target_cents", sa.BigInteger(), nullable=False),
+        sa.Column("goal_type", postgresql.ENUM(name="transactiontypeenum", create_type=False), nullable=False),
+        sa.Column("period_start", sa.Date(), nullable=False),
+        sa.Column("period_end", sa.Date(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("goals")
+    op.drop_table("budgets")
+    op.drop_table("transactions")
+    op.drop_table("subcategories")
+    op.drop_table("wallets")
+    op.drop_index("ix_users_cognito_sub", table_name="users")
+    op.drop_table("users")
+    transaction_type.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,35 @@
+"""Indexes for the hot query paths (transaction listing, ownership checks, budget/goal listings, chat context).
+
+Built CONCURRENTLY so existing tables stay writable while the indexes are created.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-03-05
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_wallets_user_id", "wallets", ["user_id"]),
+    ("ix_subcategories_user_id", "subcategories", ["user_id"]),
+    ("ix_transactions_wallet_date", "transactions", ["wallet_id", "transaction_date", "created_at", "id"]),
+    ("ix_transactions_subcategory_date", "transactions", ["subcategory_id", "transaction_date"]),
+    ("ix_budgets_user_period", "budgets", ["user_id", "period_start", "period_end"]),
+    ("ix_goals_user_period", "goals", ["user_id", "period_start", "period_end"]),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,58 @@
+"""Unique system subcategories (so seeding can upsert) and a table of setup markers.
+
+Racing workers could each insert the same default, because NULL user_ids never collide in
+uq_subcategories_type_name_user. Duplicates are merged into one row first: transactions and
+budgets are repointed to it, then the extras are deleted.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-03-19
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# System subcategory id -> the id kept for its (type, name): prefer is_system, then the lowest id.
+_DUPLICATES = """
+    WITH ranked AS (
+        SELECT id, first_value(id) OVER (
+            PARTITION BY transaction_type, name ORDER BY is_system DESC, id
+        ) AS keep_id
+        FROM subcategories
+        WHERE user_id IS NULL
+    ), duplicates AS (
+        SELECT id, keep_id FROM ranked WHERE id <> keep_id
+    )
+"""
+
+
+def upgrade() -> None:
+    for table in ("transactions", "budgets"):
+        op.execute(
+            f"{_DUPLICATES} UPDATE {table} SET subcategory_id = d.keep_id "
+            f"FROM duplicates d WHERE {table}.subcategory_id = d.id"
+        )
+    op.execute(f"{_DUPLICATES} DELETE FROM subcategories USING duplicates d WHERE subcategories.id = d.id")
+    op.create_index(
+        "uq_subcategories_system_type_name",
+        "subcategories",
+        ["transaction_type", "name"],
+        unique=True,
+        postgresql_where=sa.text("user_id IS NULL"),
+    )
+    op.create_table(
+        "schema_markers",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("schema_markers")
+    op.drop_index("uq_subcategories_system_type_name", table_name="subcategories")
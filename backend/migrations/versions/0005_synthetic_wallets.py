@@ -0,0 +1,27 @@
+"""Flag wallets created by the synthetic history generator.
+
+The generator used to replace every wallet whose name started with "Synthetic Wallet", which
+also matched wallets users had named that way. Existing wallets are left unflagged, so the
+next synthetic load keeps them and creates a fresh set.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "wallets", sa.Column("is_synthetic", sa.Boolean(), server_default=sa.text("false"), nullable=False)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("wallets", "is_synthetic")
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Write latency: the old flush + refresh pattern vs. the routers' INSERT/UPDATE ... RETURNING.
+
+Run from backend: python -m scripts.bench_writes [--iterations 500]
+
+Each write runs in its own session and commits, like a request. The script prints p50/p99
+latency and SQL statements per write. It works against DATABASE_URL, using a throwaway user
+that is deleted afterwards.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import date
+
+from sqlalchemy import delete, event, select
+
+from app.database import async_session_factory, engine
+from app.models import Subcategory, Transaction, TransactionTypeEnum, User, Wallet
+from app.routers.transactions import create_transaction, update_transaction
+from app.routers.wallets import create_wallet, update_wallet
+from app.schemas import TransactionCreate, TransactionType, TransactionUpdate, WalletCreate, WalletUpdate
+
+
+async def _refresh_create_wallet(db, user_id, name):
+    wallet = Wallet(user_id=user_id, name=name)
+    db.add(wallet)
+    await db.flush()
+    await db.refresh(wallet)
+    return wallet
+
+
+async def _refresh_update_wallet(db, user_id, wallet_id, name):
+    wallet = (await db.execute(select(Wallet).where(Wallet.id == wallet_id, Wallet.user_id == user_id))).scalar_one()
+    wallet.name = name
+    await db.flush()
+    await db.refresh(wallet)
+    return wallet
+
+
+async def _refresh_create_transaction(db, user_id, wallet_id, subcategory_id, amount):
+    (await db.execute(select(Wallet).where(Wallet.id == wallet_id, Wallet.user_id == user_id))).scalar_one()
+    tx = Transaction(
+        wallet_id=wallet_id,
+        type=TransactionTypeEnum.expense,
+        subcategory_id=subcategory_id,
+        amount_cents=amount,
+        tags=[],
+        transaction_date=date.today(),
+    )
+    db.add(tx)
+    await db.flush()
+    await db.refresh(tx)
+    return tx
+
+
+async def _refresh_update_transaction(db, user_id, tx_id, amount):
+    tx = (
+        await db.execute(select(Transaction).join(Wallet).where(Transaction.id == tx_id, Wallet.user_id == user_id))
+    ).scalar_one()
+    tx.amount_cents = amount
+    await db.flush()
+    await db.refresh(tx)
+    return tx
+
+
+async def _measure(label: str, write, iterations: int, statements: list) -> None:
+    latencies = []
+    statements.clear()
+    for i in range(iterations):
+        async with async_session_factory() as db:
+            start = time.perf_counter()
+            await write(db, i)
+            await db.commit()
+            latencies.append((time.perf_counter() - start) * 1000)
+    cuts = statistics.quantiles(latencies, n=100)
+    per_write = len(statements) / iterations
+    print(f"{label:<40} p50 {cuts[49]:7.2f} ms   p99 {cuts[98]:7.2f} ms   {per_write:.1f} statements/write")
+
+
+async def main(iterations: int) -> None:
+    statements: list[str] = []
+    event.listen(
+        engine.sync_engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement)
+    )
+    async with async_session_factory() as db:
+        user = User(cognito_sub=f"bench-{uuid.uuid4()}")
+        db.add(user)
+        await db.flush()
+        wallet = Wallet(user_id=user.id, name="Bench")
+        db.add(wallet)
+        subcategory_id = await db.scalar(
+            select(Subcategory.id).where(Subcategory.transaction_type == TransactionTypeEnum.expense).limit(1)
+        )
+        await db.commit()
+    user_id, wallet_id = user.id, wallet.id
+    async with async_session_factory() as db:
+        tx = await _refresh_create_transaction(db, user_id, wallet_id, subcategory_id, 1)
+        await db.commit()
+
+    try:
+        for _ in range(2):  # first pass warms the pool and statement caches
+            print(f"{iterations} writes each")
+            await _measure(
+                "create wallet (flush + refresh)",
+                lambda db, i: _refresh_create_wallet(db, user_id, f"w{i}"),
+                iterations, statements,
+            )
+            await _measure(
+                "create wallet (RETURNING)",
+                lambda db, i: create_wallet(WalletCreate(name=f"w{i}"), user_id=user_id, db=db),
+                iterations, statements,
+            )
+            await _measure(
+                "update wallet (flush + refresh)",
+                lambda db, i: _refresh_update_wallet(db, user_id, wallet_id, f"w{i}"),
+                iterations, statements,
+            )
+            await _measure(
+                "update wallet (RETURNING)",
+                lambda db, i: update_wallet(wallet_id, WalletUpdate(name=f"w{i}"), user_id=user_id, db=db),
+                iterations, statements,
+            )
+            await _measure(
+                "create transaction (flush + refresh)",
+                lambda db, i: _refresh_create_transaction(db, user_id, wallet_id, subcategory_id, i + 1),
+                iterations, statements,
+            )
+            body = dict(
+                wallet_id=wallet_id, type=TransactionType.expense, subcategory_id=subcategory_id,
+                transaction_date=date.today(),
+            )
+            await _measure(
+                "create transaction (RETURNING)",
+                lambda db, i: create_transaction(TransactionCreate(**body, amount_cents=i + 1), user_id=user_id, db=db),
+                iterations, statements,
+            )
+            await _measure(
+                "update transaction (flush + refresh)",
+                lambda db, i: _refresh_update_transaction(db, user_id, tx.id, i + 1),
+                iterations, statements,
+            )
+            await _measure(
+                "update transaction (RETURNING)",
+                lambda db, i: update_transaction(tx.id, TransactionUpdate(amount_cents=i + 1), user_id=user_id, db=db),
+                iterations, statements,
+            )
+            print()
+    finally:
+        async with async_session_factory() as db:
+            await db.execute(delete(User).where(User.id == user_id))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=500)
+    asyncio.run(main(parser.parse_args().iterations))
@@ -1,16 +1,37 @@
 #!/usr/bin/env python3
-"""Create DB tables from SQLAlchemy models for local dev. Run from backend: python -m scripts.create_tables"""
+"""Bring the DB schema up to date with Alembic migrations. Run from backend: python -m scripts.create_tables
+
+Databases created before migrations existed (plain create_all, no alembic_version table)
+are stamped at the initial revision first, so only the newer migrations run against them.
+"""
 import asyncio
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
+from app.database import engine
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+INITIAL_REVISION = "0001"
+
 
-from app.database import Base, engine
-from app import models  # noqa: F401 — register models with Base
+async def _needs_baseline_stamp() -> bool:
+    async with engine.connect() as conn:
+        tables = await conn.run_sync(lambda sync_conn: set(inspect(sync_conn).get_table_names()))
+    await engine.dispose()
+    return "users" in tables and "alembic_version" not in tables
 
 
-async def main():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    print("Tables created.")
+def main():
+    config = Config(str(ALEMBIC_INI))
+    if asyncio.run(_needs_baseline_stamp()):
+        command.stamp(config, INITIAL_REVISION)
+        print(f"Existing schema stamped at revision {INITIAL_REVISION}.")
+    command.upgrade(config, "head")
+    print("Schema is up to date.")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Load a deterministic synthetic transaction history for load testing.
+
+Run from backend: python -m scripts.generate_synthetic --transactions 1000000 --wallets 10 --seed 42
+
+The history goes to the user with --cognito-sub, who is created if missing. Earlier synthetic
+wallets of that user are replaced. The same seed always produces the same rows, apart from
+their ids.
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.database import async_session_factory, engine
+from app.main import seed_default_subcategories_session
+from app.models import User
+from app.routers.demo import load_synthetic_history
+
+
+async def main(args: argparse.Namespace) -> None:
+    start = time.perf_counter()
+    async with async_session_factory() as db:
+        await seed_default_subcategories_session(db)
+        await db.execute(insert(User).values(cognito_sub=args.cognito_sub).on_conflict_do_nothing())
+        user_id = await db.scalar(select(User.id).where(User.cognito_sub == args.cognito_sub))
+        wallet_ids, loaded = await load_synthetic_history(
+            db, user_id, args.transactions, args.wallets, args.seed, args.days
+        )
+        await db.commit()
+    await engine.dispose()
+    elapsed = time.perf_counter() - start
+    print(f"Loaded {loaded} transactions into {len(wallet_ids)} wallets for user {user_id} in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cognito-sub", default="synthetic-load-test")
+    parser.add_argument("--transactions", type=int, default=100000)
+    parser.add_argument("--wallets", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--days", type=int, default=365)
+    asyncio.run(main(parser.parse_args()))
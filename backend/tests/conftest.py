@@ -8,8 +8,10 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_asyn
 from sqlalchemy.pool import NullPool
 
 from app.auth import get_current_user_id, get_token_payload
+from app.bedrock import get_bedrock_client
 from app.config import settings
-from app.database import get_db
+from app.database import get_db, get_session_factory
+from app.deps import get_read_db, get_read_session_factory
 from app.main import app, seed_default_subcategories_session
 from app.models import User
 
@@ -26,6 +28,41 @@ test_session_factory = async_sessionmaker(
 )
 
 
+class StubBedrockClient:
+    """Local stand-in for BedrockClient: records payloads and returns a canned reply."""
+
+    @staticmethod
+    def user_text(payload: dict) -> str:
+        """The user turn of a recorded payload as plain text (content may be a list of blocks)."""
+        content = payload["messages"][-1]["content"]
+        return content if isinstance(content, str) else "".join(block["text"] for block in content)
+
+    @staticmethod
+    def system_text(payload: dict) -> str:
+        """The system prompt of a recorded payload, financial context included, as plain text."""
+        system = payload["system"]
+        return system if isinstance(system, str) else "\n\n".join(block["text"] for block in system)
+
+    model_id = "stub-model"
+
+    def __init__(self, reply: str = "Penny stub reply: coins are looking good!"):
+        self.reply = reply
+        self.usage = {"input_tokens": 10, "output_tokens": 5}
+        self.payloads: list[dict] = []
+
+    async def invoke(self, payload: dict) -> dict:
+        self.payloads.append(payload)
+        return {"content": [{"type": "text", "text": self.reply}], "usage": self.usage}
+
+    async def stream(self, payload: dict):
+        self.payloads.append(payload)
+        yield {"type": "message_start", "message": {"role": "assistant", "usage": {"input_tokens": 10}}}
+        for word in self.reply.split(" "):
+            yield {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": word + " "}}
+        yield {"type": "message_delta", "delta": {"stop_reason": "end_turn"}, "usage": {"output_tokens": 5}}
+        yield {"type": "message_stop"}
+
+
 @pytest.fixture
 def anyio_backend():
     return "asyncio"
@@ -58,7 +95,12 @@ async def test_user():
 
 
 @pytest.fixture
-async def client(test_user, seed_subcategories):
+def bedrock_stub():
+    return StubBedrockClient()
+
+
+@pytest.fixture
+async def client(test_user, seed_subcategories, bedrock_stub):
     """Async HTTP client with auth overrides so no real Cognito is needed."""
     user_id, cognito_sub = test_user
 
@@ -82,6 +124,10 @@ async def client(test_user, seed_subcategories):
     app.dependency_overrides[get_current_user_id] = override_get_current_user_id
     app.dependency_overrides[get_token_payload] = override_get_token_payload
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: test_session_factory
+    app.dependency_overrides[get_read_session_factory] = lambda: test_session_factory
+    app.dependency_overrides[get_bedrock_client] = lambda: bedrock_stub
     try:
         transport = ASGITransport(app=app)
         async with AsyncClient(transport=transport, base_url="http://test") as ac:
@@ -0,0 +1,149 @@
+import asyncio
+import time
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwk, jwt
+
+from app import auth
+from app.auth import JWKSCache
+from app.config import settings
+from tests.conftest import test_session_factory as session_factory
+
+
+def _fetcher(key_sets: list[list[str]]):
+    """Fake JWKS endpoint returning successive key sets (the last one repeats); counts calls."""
+    calls = {"n": 0}
+
+    async def fetch() -> dict:
+        i = min(calls["n"], len(key_sets) - 1)
+        calls["n"] += 1
+        await asyncio.sleep(0)
+        return {"keys": [{"kid": kid, "kty": "RSA"} for kid in key_sets[i]]}
+
+    return fetch, calls
+
+
+@pytest.mark.asyncio
+async def test_jwks_cached_between_requests():
+    fetch, calls = _fetcher([["k1"]])
+    cache = JWKSCache(fetch=fetch)
+    assert (await cache.get_key("k1"))["kid"] == "k1"
+    assert (await cache.get_key("k1"))["kid"] == "k1"
+    assert calls["n"] == 1
+
+
+@pytest.mark.asyncio
+async def test_jwks_kid_miss_refetches_once_for_concurrent_requests():
+    fetch, calls = _fetcher([["old"], ["old", "new"]])
+    cache = JWKSCache(fetch=fetch, min_refetch_seconds=0)
+    await cache.refresh()
+    keys = await asyncio.gather(*(cache.get_key("new") for _ in range(20)))
+    assert all(k["kid"] == "new" for k in keys)
+    assert calls["n"] == 2
+
+
+@pytest.mark.asyncio
+async def test_jwks_kid_miss_rate_limited():
+    fetch, calls = _fetcher([["k1"]])
+    cache = JWKSCache(fetch=fetch, min_refetch_seconds=60)
+    await cache.refresh()
+    assert await cache.get_key("unknown") is None
+    assert await cache.get_key("unknown") is None
+    assert calls["n"] == 1
+
+
+@pytest.mark.asyncio
+async def test_jwks_stale_keys_served_while_refreshing_in_background():
+    fetch, calls = _fetcher([["k1"], ["k2"]])
+    cache = JWKSCache(fetch=fetch, ttl_seconds=0, min_refetch_seconds=60)
+    await cache.refresh()
+    assert (await cache.get_key("k1"))["kid"] == "k1"
+    await cache._background
+    assert calls["n"] == 2
+    assert (await cache.get_key("k2"))["kid"] == "k2"
+    await cache.stop()
+
+
+@pytest.mark.asyncio
+async def test_verified_token_cached_until_exp(monkeypatch):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    public_jwk = {**jwk.construct(public_pem, "RS256").to_dict(), "kid": "test-kid", "alg": "RS256"}
+
+    async def fetch() -> dict:
+        return {"keys": [public_jwk]}
+
+    monkeypatch.setattr(settings, "cognito_user_pool_id", "us-east-1_test")
+    monkeypatch.setattr(settings, "cognito_app_client_id", "test-client")
+    monkeypatch.setattr(auth, "jwks_cache", JWKSCache(fetch=fetch))
+    monkeypatch.setattr(auth, "_verified_tokens", auth.TTLCache(maxsize=10))
+
+    decodes = {"n": 0}
+    real_decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        decodes["n"] += 1
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(auth.jwt, "decode", counting_decode)
+
+    claims = {
+        "sub": "user-1",
+        "aud": "test-client",
+        "iss": settings.cognito_issuer,
+        "exp": int(time.time()) + 300,
+    }
+    token = jwt.encode(claims, private_pem.decode(), algorithm="RS256", headers={"kid": "test-kid"})
+
+    assert (await auth._verify_cognito_token(token))["sub"] == "user-1"
+    assert (await auth._verify_cognito_token(token))["sub"] == "user-1"
+    assert decodes["n"] == 1
+
+    expired = jwt.encode(
+        {**claims, "exp": int(time.time()) - 10}, private_pem.decode(), algorithm="RS256", headers={"kid": "test-kid"}
+    )
+    with pytest.raises(HTTPException):
+        await auth._verify_cognito_token(expired)
+    with pytest.raises(HTTPException):
+        await auth._verify_cognito_token(expired)
+    assert decodes["n"] == 3
+
+
+@pytest.mark.asyncio
+async def test_user_id_lookup_cached_per_sub(monkeypatch, test_user):
+    user_id, cognito_sub = test_user
+
+    async def verified(token: str) -> dict:
+        return {"sub": cognito_sub}
+
+    class NoQuerySession:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def scalar(self, *args, **kwargs):
+            raise AssertionError("cached lookup must not query")
+
+    monkeypatch.setattr(settings, "cognito_user_pool_id", "us-east-1_test")
+    monkeypatch.setattr(settings, "cognito_app_client_id", "test-client")
+    monkeypatch.setattr(auth, "_verify_cognito_token", verified)
+    monkeypatch.setattr(auth, "_user_ids", auth.TTLCache(maxsize=10))
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials="token")
+
+    assert await auth.get_current_user_id(credentials, session_factory) == user_id
+    assert await auth.get_current_user_id(credentials, NoQuerySession) == user_id
+
+    auth.invalidate_user_id(cognito_sub)
+    with pytest.raises(AssertionError):
+        await auth.get_current_user_id(credentials, NoQuerySession)
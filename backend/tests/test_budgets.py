@@ -58,3 +58,76 @@ async def test_budgets_invalid_period(client: AsyncClient, auth_headers: dict):
         headers=auth_headers,
     )
     assert r.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_budgets_update_one_sided_period(client: AsyncClient, auth_headers: dict):
+    subcategory_id = (await client.get("/subcategories?type=expense", headers=auth_headers)).json()[0]["id"]
+    r = await client.post(
+        "/budgets",
+        json={
+            "subcategory_id": subcategory_id,
+            "limit_cents": 1000,
+            "period_start": "2025-01-01",
+            "period_end": "2025-01-31",
+        },
+        headers=auth_headers,
+    )
+    budget_id = r.json()["id"]
+
+    r = await client.put(f"/budgets/{budget_id}", json={"period_start": "2025-02-01"}, headers=auth_headers)
+    assert r.status_code == 400
+    r = await client.put(f"/budgets/{budget_id}", json={"period_end": "2025-01-15"}, headers=auth_headers)
+    assert r.status_code == 200
+    assert (r.json()["period_start"], r.json()["period_end"]) == ("2025-01-01", "2025-01-15")
+    r = await client.put(
+        "/budgets/00000000-0000-0000-0000-000000000000", json={"period_end": "2025-01-15"}, headers=auth_headers
+    )
+    assert r.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_budgets_progress(client: AsyncClient, auth_headers: dict):
+    rw = await client.post("/wallets", json={"name": "Budget-Wallet"}, headers=auth_headers)
+    wallet_id = rw.json()["id"]
+    subs = (await client.get("/subcategories?type=expense", headers=auth_headers)).json()
+    food, other = subs[0]["id"], subs[1]["id"]
+
+    r = await client.post(
+        "/budgets",
+        json={"subcategory_id": food, "limit_cents": 10000, "period_start": "2025-05-01", "period_end": "2025-05-31"},
+        headers=auth_headers,
+    )
+    budget_id = r.json()["id"]
+    r = await client.post(
+        "/budgets",
+        json={"subcategory_id": other, "limit_cents": 5000, "period_start": "2025-05-01", "period_end": "2025-05-31"},
+        headers=auth_headers,
+    )
+    empty_id = r.json()["id"]
+
+    for sc, amount, day in ((food, 2500, "2025-05-03"), (food, 5000, "2025-05-20"), (food, 9999, "2025-06-01")):
+        r = await client.post(
+            "/transactions",
+            json={
+                "wallet_id": wallet_id,
+                "type": "expense",
+                "subcategory_id": sc,
+                "amount_cents": amount,
+                "transaction_date": day,
+            },
+            headers=auth_headers,
+        )
+        assert r.status_code == 201
+
+    r = await client.get("/budgets/progress", headers=auth_headers)
+    assert r.status_code == 200
+    progress = {b["id"]: b for b in r.json()}
+    assert progress[budget_id]["spent_cents"] == 7500
+    assert progress[budget_id]["remaining_cents"] == 2500
+    assert progress[budget_id]["percent_used"] == 75.0
+    assert progress[empty_id]["spent_cents"] == 0
+    assert progress[empty_id]["percent_used"] == 0.0
+
+    r = await client.get("/budgets/progress", params={"period_start": "2025-07-01"}, headers=auth_headers)
+    assert all(b["id"] not in (budget_id, empty_id) for b in r.json())
@@ -0,0 +1,49 @@
+import time
+import uuid
+
+from app import database
+from app.cache import TTLCache, data_versions
+from app.config import settings
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_ttl_cache_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl_seconds=60)
+    cache.set("default", 1)
+    cache.set("short", 2, ttl=5)
+    cache.set("already-expired", 3, ttl=-1)
+    assert "already-expired" not in cache
+    now[0] += 10
+    assert cache.get("short") is None
+    assert cache.get("default") == 1
+    now[0] += 60
+    assert cache.get("default", "gone") == "gone"
+    assert len(cache) == 0
+
+
+def test_reads_go_to_primary_within_read_your_writes_window(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(database, "read_session_factory", "replica")
+    monkeypatch.setattr(database, "async_session_factory", "primary")
+    monkeypatch.setattr(settings, "read_your_writes_seconds", 5)
+    user_id, other_user_id = uuid.uuid4(), uuid.uuid4()
+    assert database.read_session_factory_for(user_id) == "replica"
+    data_versions.bump(user_id)
+    assert database.read_session_factory_for(user_id) == "primary"
+    assert database.read_session_factory_for(other_user_id) == "replica"
+    now[0] += 5
+    assert database.read_session_factory_for(user_id) == "replica"
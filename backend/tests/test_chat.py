@@ -1,5 +1,22 @@
+import asyncio
+import io
+import json
+import time
+import uuid
+from datetime import date
+from types import SimpleNamespace
+
 import pytest
+from botocore.exceptions import ClientError
 from httpx import AsyncClient
+from sqlalchemy import event
+from starlette.requests import ClientDisconnect
+
+from app.bedrock import BedrockClient, get_bedrock_client
+from app.config import settings
+from app.main import app
+from app.routers import chat as chat_router
+from tests.conftest import _test_engine, test_session_factory as session_factory
 
 
 @pytest.mark.asyncio
@@ -10,3 +27,452 @@ async def test_chat_stub(client: AsyncClient, auth_headers: dict):
     assert "reply" in data
     assert isinstance(data["reply"], str)
     assert "stub" in data["reply"].lower() or "Bedrock" in data["reply"]
+
+
+@pytest.mark.asyncio
+async def test_chat_sends_question_to_bedrock(client: AsyncClient, auth_headers: dict, bedrock_stub):
+    r = await client.post("/chat", json={"message": "How am I doing on budgets?"}, headers=auth_headers)
+    assert r.status_code == 200
+    payload = bedrock_stub.payloads[-1]
+    assert "How am I doing on budgets?" in bedrock_stub.user_text(payload)
+
+
+class _SlowRuntime:
+    """Blocking boto3-like runtime client, as the real one is."""
+
+    def invoke_model(self, modelId: str, body: str) -> dict:
+        time.sleep(0.5)
+        reply = {"content": [{"type": "text", "text": "slow stub reply"}]}
+        return {"body": io.BytesIO(json.dumps(reply).encode())}
+
+
+@pytest.mark.asyncio
+async def test_chat_holds_no_connection_during_bedrock_call(client: AsyncClient, auth_headers: dict, bedrock_stub):
+    checked_out = [0]
+    peak = [0]
+    during_call = []
+
+    def checkout(*args):
+        checked_out[0] += 1
+        peak[0] = max(peak[0], checked_out[0])
+
+    def checkin(*args):
+        checked_out[0] -= 1
+
+    async def invoke(payload: dict) -> dict:
+        during_call.append(checked_out[0])
+        return {"content": [{"type": "text", "text": "ok"}], "usage": {}}
+
+    bedrock_stub.invoke = invoke
+    event.listen(_test_engine.sync_engine, "checkout", checkout)
+    event.listen(_test_engine.sync_engine, "checkin", checkin)
+    try:
+        r = await client.post("/chat", json={"message": "Anything to cut back on?"}, headers=auth_headers)
+    finally:
+        event.remove(_test_engine.sync_engine, "checkout", checkout)
+        event.remove(_test_engine.sync_engine, "checkin", checkin)
+    assert r.status_code == 200
+    assert peak[0] >= 1  # context, history and the saved turn did use connections
+    assert during_call == [0]
+
+
+@pytest.mark.asyncio
+async def test_context_load_caps_pooled_connections(monkeypatch):
+    checked_out = [0]
+    peak = [0]
+
+    def checkout(*args):
+        checked_out[0] += 1
+        peak[0] = max(peak[0], checked_out[0])
+
+    def checkin(*args):
+        checked_out[0] -= 1
+
+    monkeypatch.setattr(settings, "chat_context_max_connections", 2)
+    event.listen(_test_engine.sync_engine, "checkout", checkout)
+    event.listen(_test_engine.sync_engine, "checkin", checkin)
+    try:
+        data = await chat_router._fetch_user_financial_data(session_factory, uuid.uuid4())
+    finally:
+        event.remove(_test_engine.sync_engine, "checkout", checkout)
+        event.remove(_test_engine.sync_engine, "checkin", checkin)
+    assert peak[0] == 2
+    assert set(data["timings"]) == {"wallets", "totals", "monthly", "transactions", "budgets", "goals", "total"}
+
+
+@pytest.mark.asyncio
+async def test_chat_does_not_block_event_loop(client: AsyncClient, auth_headers: dict):
+    bedrock = BedrockClient(region="us-east-1", model_id="stub-model", client=_SlowRuntime())
+    app.dependency_overrides[get_bedrock_client] = lambda: bedrock
+    try:
+        chat = asyncio.create_task(client.post("/chat", json={"message": "hi"}, headers=auth_headers))
+        await asyncio.sleep(0.05)
+        started = time.monotonic()
+        r = await client.get("/health")
+        assert r.status_code == 200
+        assert time.monotonic() - started < 0.3
+        assert not chat.done()
+        assert (await chat).json()["reply"] == "slow stub reply"
+    finally:
+        bedrock.close()
+
+
+def _sse_events(text: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_sse(client: AsyncClient, auth_headers: dict, bedrock_stub):
+    r = await client.post("/chat/stream", json={"message": "Summarize my month"}, headers=auth_headers)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/event-stream")
+    events = _sse_events(r.text)
+    deltas = [data["text"] for name, data in events if name == "delta"]
+    assert len(deltas) > 1
+    name, done = events[-1]
+    assert name == "done"
+    assert done["reply"] == "".join(deltas)
+    assert "stub" in done["reply"].lower()
+    assert "Summarize my month" in done["prompt"]
+    assert done["usage"] == {
+        "input_tokens": 10, "cache_read_input_tokens": 0, "cache_creation_input_tokens": 0, "output_tokens": 5
+    }
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_empty_reply_is_not_stored(client: AsyncClient, auth_headers: dict, bedrock_stub):
+    async def silent_stream(payload: dict):
+        bedrock_stub.payloads.append(payload)
+        yield {"type": "message_start", "message": {"role": "assistant", "usage": {"input_tokens": 10}}}
+        yield {"type": "message_stop"}
+
+    bedrock_stub.stream = silent_stream
+    sessions = len((await client.get("/chat/sessions", headers=auth_headers)).json())
+    for _ in range(2):
+        r = await client.post("/chat/stream", json={"message": "Say nothing"}, headers=auth_headers)
+        assert _sse_events(r.text) == [("error", {"detail": "AI service returned an empty reply"})]
+    assert len(bedrock_stub.payloads) == 2  # nothing went to the reply cache
+    assert len((await client.get("/chat/sessions", headers=auth_headers)).json()) == sessions
+
+
+@pytest.mark.asyncio
+async def test_bedrock_stream_closed_when_client_leaves_before_body():
+    closed = []
+
+    async def events():
+        try:
+            yield {"type": "message_start"}
+            yield {"type": "message_stop"}
+        finally:
+            closed.append(True)
+
+    stream = events()
+    await anext(stream)  # the handler reads the first event before returning the response
+
+    async def body():
+        yield "never sent"
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        raise OSError("client disconnected")
+
+    response = chat_router._BedrockStreamResponse(body(), stream, headers={})
+    with pytest.raises(ClientDisconnect):
+        await response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+    assert closed == [True]
+
+
+class _StreamingRuntime:
+    def invoke_model_with_response_stream(self, modelId: str, body: str) -> dict:
+        events = [
+            {"type": "message_start"},
+            {"type": "content_block_delta", "delta": {"type": "text_delta", "text": "Yay "}},
+            {"type": "content_block_delta", "delta": {"type": "text_delta", "text": "coins!"}},
+            {"type": "message_stop"},
+        ]
+        return {"body": [{"chunk": {"bytes": json.dumps(e).encode()}} for e in events]}
+
+
+@pytest.mark.asyncio
+async def test_bedrock_client_stream_yields_events_in_order():
+    bedrock = BedrockClient(region="us-east-1", model_id="stub-model", client=_StreamingRuntime())
+    try:
+        events = [event async for event in bedrock.stream({"messages": []})]
+    finally:
+        bedrock.close()
+    assert [e["type"] for e in events] == ["message_start", "content_block_delta", "content_block_delta", "message_stop"]
+    assert "".join(e["delta"]["text"] for e in events if "delta" in e) == "Yay coins!"
+
+
+class _DeniedRuntime:
+    def invoke_model_with_response_stream(self, modelId: str, body: str) -> dict:
+        raise ClientError({"Error": {"Code": "AccessDeniedException", "Message": "no"}}, "InvokeModelWithResponseStream")
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_error_before_first_chunk_is_http_error(client: AsyncClient, auth_headers: dict):
+    bedrock = BedrockClient(region="us-east-1", model_id="stub-model", client=_DeniedRuntime())
+    app.dependency_overrides[get_bedrock_client] = lambda: bedrock
+    try:
+        r = await client.post("/chat/stream", json={"message": "hi"}, headers=auth_headers)
+    finally:
+        bedrock.close()
+    assert r.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_chat_context_includes_user_data_and_timings(client: AsyncClient, auth_headers: dict, bedrock_stub):
+    rw = await client.post("/wallets", json={"name": "Chat-Wallet"}, headers=auth_headers)
+    sc = (await client.get("/subcategories?type=expense", headers=auth_headers)).json()[0]
+    await client.post(
+        "/transactions",
+        json={
+            "wallet_id": rw.json()["id"],
+            "type": "expense",
+            "subcategory_id": sc["id"],
+            "amount_cents": 4321,
+            "description": "Chat context check",
+            "transaction_date": "2025-08-01",
+        },
+        headers=auth_headers,
+    )
+    today = date.today()
+    for limit, start, end in ((9900, today.replace(day=1), today), (5500, "2025-08-01", "2025-08-31")):
+        await client.post(
+            "/budgets",
+            json={"subcategory_id": sc["id"], "limit_cents": limit, "period_start": str(start), "period_end": str(end)},
+            headers=auth_headers,
+        )
+
+    r = await client.post("/chat", json={"message": "hi"}, headers=auth_headers)
+    assert r.status_code == 200
+    prompt = bedrock_stub.system_text(bedrock_stub.payloads[-1])
+    assert "Chat-Wallet" in prompt
+    assert f"$43.21 (expense) {sc['name']} - Chat context check" in prompt
+    assert f"{sc['name']}: $99.00 limit" in prompt
+    assert "$55.00 limit" not in prompt  # expired budgets are left out
+    timing = r.headers["server-timing"]
+    for name in ("wallets", "transactions", "budgets", "goals", "total"):
+        assert f"ctx-{name};dur=" in timing
+
+
+@pytest.mark.asyncio
+async def test_chat_context_cached_until_user_data_changes(
+    client: AsyncClient, auth_headers: dict, bedrock_stub, monkeypatch
+):
+    loads = {"n": 0}
+    real_fetch = chat_router._fetch_user_financial_data
+
+    async def counting_fetch(*args, **kwargs):
+        loads["n"] += 1
+        return await real_fetch(*args, **kwargs)
+
+    monkeypatch.setattr(chat_router, "_fetch_user_financial_data", counting_fetch)
+
+    await client.post("/wallets", json={"name": "Before"}, headers=auth_headers)
+    first = await client.post("/chat", json={"message": "one"}, headers=auth_headers)
+    second = await client.post("/chat", json={"message": "two"}, headers=auth_headers)
+    assert loads["n"] == 1
+    assert second.headers["server-timing"].startswith("ctx-cache;desc=hit, tokens-input;desc=10")
+    assert "Before" in bedrock_stub.system_text(bedrock_stub.payloads[-1])
+    assert bedrock_stub.user_text(bedrock_stub.payloads[-1]).endswith("User question: two")
+    assert first.headers["server-timing"] != second.headers["server-timing"]
+
+    await client.post("/wallets", json={"name": "After"}, headers=auth_headers)
+    await client.post("/chat", json={"message": "three"}, headers=auth_headers)
+    assert loads["n"] == 2
+    assert "After" in bedrock_stub.system_text(bedrock_stub.payloads[-1])
+
+
+@pytest.mark.asyncio
+async def test_repeated_question_served_from_reply_cache(client: AsyncClient, auth_headers: dict, bedrock_stub):
+    first = await client.post("/chat", json={"message": "How am I doing on budgets?"}, headers=auth_headers)
+    again = await client.post("/chat", json={"message": "  how am I doing on budgets "}, headers=auth_headers)
+    assert again.json()["reply"] == first.json()["reply"]
+    assert "reply-cache;desc=hit" in again.headers["server-timing"]
+    assert len(bedrock_stub.payloads) == 1
+
+    streamed = await client.post("/chat/stream", json={"message": "How am I doing on budgets?"}, headers=auth_headers)
+    assert "reply-cache;desc=hit" in streamed.headers["server-timing"]
+    assert f'"reply": {json.dumps(first.json()["reply"])}' in streamed.text
+    assert len(bedrock_stub.payloads) == 1
+
+    await client.post("/wallets", json={"name": "Changes the data"}, headers=auth_headers)
+    await client.post("/chat", json={"message": "How am I doing on budgets?"}, headers=auth_headers)
+    assert len(bedrock_stub.payloads) == 2
+
+
+def test_context_fits_token_budget():
+    sc = SimpleNamespace(id="sc", name="Groceries")
+    transactions = [
+        SimpleNamespace(
+            subcategory_id="sc",
+            amount_cents=100 + i,
+            type=SimpleNamespace(value="expense"),
+            transaction_date=date(2025, 8, 1),
+            description=f"Row {i}",
+        )
+        for i in range(50)
+    ]
+    data = {
+        "wallets": [{"name": "Main", "balance_cents": 500, "count": 50}],
+        "totals": [{"type": "expense", "total_cents": 6225, "count": 50}],
+        "monthly": [
+            {"month": date(2025, m, 1), "type": "expense", "name": "Groceries", "total_cents": 100, "count": 1}
+            for m in range(12, 0, -1)
+        ],
+        "budgets": [],
+        "goals": [],
+        "transactions": transactions,
+        "subcategories": {"sc": sc},
+    }
+    small = chat_router._build_context(data, token_budget=300)
+    large = chat_router._build_context(data, token_budget=10_000)
+    assert chat_router._estimate_tokens(small) <= 300
+    assert "- 2025-12 expense Groceries: $1.00 (1)" in small
+    assert "Row 0" in small and "Row 49" not in small and "more not shown" in small
+    assert "Row 49" in large and "more not shown" not in large
+
+
+def test_context_budget_caps_aggregate_sections():
+    budgets = [
+        {"name": f"Budget {i}", "limit_cents": 10000, "spent_cents": 500, "percent_used": 5.0,
+         "period_start": date(2026, 10, 1), "period_end": date(2026, 10, 31)}
+        for i in range(40)
+    ]
+    goals = [
+        {"title": f"Goal {i}", "target_cents": 10000, "goal_type": "investment", "period_start": date(2026, 1, 1),
+         "period_end": date(2026, 12, 31), "progress_cents": 100, "percent_complete": 1.0}
+        for i in range(40)
+    ]
+    data = {
+        "wallets": [{"name": f"Wallet {i}", "balance_cents": 500, "count": 5} for i in range(40)],
+        "totals": [{"type": "expense", "total_cents": 6225, "count": 50}],
+        "monthly": [],
+        "budgets": budgets,
+        "goals": goals,
+        "transactions": [],
+        "subcategories": {},
+    }
+    full = chat_router._build_context(data, token_budget=100_000)
+    assert chat_router._estimate_tokens(full) > 1000  # the aggregates alone are far over the budget below
+    context = chat_router._build_context(data, token_budget=400)
+    assert chat_router._estimate_tokens(context) <= 400
+    assert "- Wallet 0:" in context and "more not shown" in context
+    tiny = chat_router._build_context(data, token_budget=86)  # just above the headings
+    assert chat_router._estimate_tokens(tiny) <= 86
+    assert "Wallet 0" not in tiny and "- (not shown)" in tiny
+
+
+@pytest.mark.asyncio
+async def test_chat_context_uses_aggregates(client: AsyncClient, auth_headers: dict, bedrock_stub):
+    rw = await client.post("/wallets", json={"name": "Agg-Wallet"}, headers=auth_headers)
+    sc = (await client.get("/subcategories?type=expense", headers=auth_headers)).json()[0]
+    today = date.today()
+    for amount in (1000, 2500):
+        await client.post(
+            "/transactions",
+            json={
+                "wallet_id": rw.json()["id"],
+                "type": "expense",
+                "subcategory_id": sc["id"],
+                "amount_cents": amount,
+                "transaction_date": today.isoformat(),
+            },
+            headers=auth_headers,
+        )
+    await client.post("/chat", json={"message": "hi"}, headers=auth_headers)
+    prompt = bedrock_stub.system_text(bedrock_stub.payloads[-1])
+    assert "- Agg-Wallet: $-35.00 balance (2 transactions)" in prompt
+    assert "- expense: $35.00 (2 transactions)" in prompt
+    assert f"- {today:%Y-%m} expense {sc['name']}: $35.00 (2)" in prompt
+
+
+@pytest.mark.asyncio
+async def test_system_prompt_and_context_marked_cacheable(
+    client: AsyncClient, auth_headers: dict, bedrock_stub, monkeypatch, caplog
+):
+    caplog.set_level("INFO", logger="app.routers.chat")
+    await client.post("/chat", json={"message": "cache me"}, headers=auth_headers)
+    payload = bedrock_stub.payloads[-1]
+    assert payload["system"][0]["text"] == chat_router.COIN_BABY_SYSTEM
+    assert "cache_control" not in payload["system"][0]  # one breakpoint, at the end of the prefix
+    context = payload["system"][1]
+    assert context["text"].startswith("User financial data:") and context["cache_control"] == {"type": "ephemeral"}
+    assert payload["messages"][-1]["content"] == "User question: cache me"
+    assert "Bedrock usage (stub-model): input=10 cache_read=0 cache_write=0 output=5" in caplog.text
+    bedrock_stub.usage = {"input_tokens": 12, "cache_read_input_tokens": 2100, "output_tokens": 5}
+    r = await client.post("/chat", json={"message": "read the cache"}, headers=auth_headers)
+    assert r.headers["server-timing"].endswith(
+        "tokens-input;desc=12, tokens-cache-read;desc=2100, tokens-cache-write;desc=0, tokens-output;desc=5"
+    )
+
+    monkeypatch.setattr(settings, "bedrock_prompt_caching", False)
+    await client.post("/chat", json={"message": "no cache"}, headers=auth_headers)
+    payload = bedrock_stub.payloads[-1]
+    assert payload["system"].startswith(f"{chat_router.COIN_BABY_SYSTEM}\n\nUser financial data:")
+    assert payload["messages"][-1]["content"] == "User question: no cache"
+
+
+@pytest.mark.asyncio
+async def test_session_turns_share_cached_prefix(client: AsyncClient, auth_headers: dict, bedrock_stub):
+    r = await client.post("/chat", json={"message": "first question"}, headers=auth_headers)
+    session_id = r.json()["session_id"]
+    await client.post("/chat", json={"message": "second question", "session_id": session_id}, headers=auth_headers)
+    await client.post("/chat/stream", json={"message": "third question", "session_id": session_id}, headers=auth_headers)
+
+    # Everything up to the last cache breakpoint is identical; only the messages after it grow
+    first, second, third = bedrock_stub.payloads
+    assert first["system"] == second["system"] == third["system"]
+    assert first["system"][-1]["cache_control"] == {"type": "ephemeral"}
+    assert "User financial data:" not in json.dumps([p["messages"] for p in (first, second, third)])
+    assert third["messages"][:2] == second["messages"][:2]
+
+
+@pytest.mark.asyncio
+async def test_chat_session_keeps_rolling_summarized_history(
+    client: AsyncClient, auth_headers: dict, bedrock_stub, monkeypatch
+):
+    monkeypatch.setattr(settings, "chat_history_messages", 2)
+    r = await client.post("/chat", json={"message": "first question"}, headers=auth_headers)
+    session_id = r.json()["session_id"]
+    assert session_id
+    assert len(bedrock_stub.payloads[-1]["messages"]) == 1
+
+    await client.post("/chat", json={"message": "second question", "session_id": session_id}, headers=auth_headers)
+    messages = bedrock_stub.payloads[-1]["messages"]
+    assert [m["role"] for m in messages] == ["user", "assistant", "user"]
+    assert messages[0]["content"] == "first question"
+
+    # The first turn falls out of the two-message window and is only sent as summary.
+    r = await client.post("/chat/stream", json={"message": "third question", "session_id": session_id}, headers=auth_headers)
+    assert f'"session_id": "{session_id}"' in r.text
+    messages = bedrock_stub.payloads[-1]["messages"]
+    assert [m["content"] for m in messages[:-1]] == ["second question", bedrock_stub.reply]
+    question = bedrock_stub.user_text(bedrock_stub.payloads[-1])
+    assert f"Earlier in this conversation:\n- Q: first question / A: {bedrock_stub.reply}" in question
+
+    sessions = (await client.get("/chat/sessions", headers=auth_headers)).json()
+    assert [(s["id"], s["title"], s["message_count"]) for s in sessions] == [(session_id, "first question", 6)]
+    detail = (await client.get(f"/chat/sessions/{session_id}", headers=auth_headers)).json()
+    assert [m["content"] for m in detail["messages"] if m["role"] == "user"] == [
+        "first question", "second question", "third question"
+    ]
+    assert detail["summary"].startswith("- Q: first question")
+
+    assert (await client.delete(f"/chat/sessions/{session_id}", headers=auth_headers)).status_code == 204
+    r = await client.post("/chat", json={"message": "again", "session_id": session_id}, headers=auth_headers)
+    assert r.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_follow_up_in_session_skips_reply_cache(client: AsyncClient, auth_headers: dict, bedrock_stub):
+    r = await client.post("/chat", json={"message": "same"}, headers=auth_headers)
+    await client.post("/chat", json={"message": "same", "session_id": r.json()["session_id"]}, headers=auth_headers)
+    assert len(bedrock_stub.payloads) == 2
@@ -0,0 +1,54 @@
+import pytest
+from httpx import AsyncClient
+
+from app.config import settings
+from app.routers.demo import PROFILES, synthetic_records
+
+
+@pytest.mark.asyncio
+async def test_demo_profile_load(client: AsyncClient, auth_headers: dict):
+    r = await client.post("/demo", json={"profile": "savvy_investor"}, headers=auth_headers)
+    assert r.status_code == 200
+    data = r.json()
+    assert data["transactions_loaded"] == len(PROFILES["savvy_investor"])
+
+    # Reloading replaces the demo wallet's transactions instead of adding to them
+    r = await client.post("/demo", json={"profile": "budget_conscious"}, headers=auth_headers)
+    assert r.json()["wallet_id"] == data["wallet_id"]
+    txs = (await client.get(f"/transactions?wallet_id={data['wallet_id']}", headers=auth_headers)).json()
+    assert len(txs) == len(PROFILES["budget_conscious"])
+
+    r = await client.post("/demo", json={"profile": "nope"}, headers=auth_headers)
+    assert r.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_demo_synthetic_load(client: AsyncClient, auth_headers: dict, monkeypatch):
+    body = {"transactions": 2500, "wallets": 4, "seed": 7, "days": 90}
+    assert (await client.post("/demo/synthetic", json=body, headers=auth_headers)).status_code == 404
+
+    monkeypatch.setattr(settings, "demo_synthetic_enabled", True)
+    own = (await client.post("/wallets", json={"name": "Synthetic Wallet 1"}, headers=auth_headers)).json()
+    r = await client.post("/demo/synthetic", json=body, headers=auth_headers)
+    assert r.status_code == 200
+    data = r.json()
+    assert data["transactions_loaded"] == 2500 and len(data["wallet_ids"]) == 4
+
+    # Loading again replaces the generated wallets, but not the user's own one with the same name
+    r = await client.post("/demo/synthetic", json={**body, "wallets": 2}, headers=auth_headers)
+    wallets = (await client.get("/wallets", headers=auth_headers)).json()
+    named = sorted(w["id"] for w in wallets if w["name"].startswith("Synthetic Wallet"))
+    assert named == sorted([own["id"], *r.json()["wallet_ids"]])
+
+    r = await client.post("/demo/synthetic", json={"transactions": 0}, headers=auth_headers)
+    assert r.status_code == 422
+
+
+def test_synthetic_records_are_deterministic():
+    subcategories = {entry[:2]: f"{entry[0]}:{entry[1]}" for entries in PROFILES.values() for entry in entries}
+
+    def rows(seed):
+        return [record[1:] for record in synthetic_records(seed, 500, ["w1", "w2"], subcategories, days=30)]
+
+    assert rows(3) == rows(3)
+    assert rows(3) != rows(4)
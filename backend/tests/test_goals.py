@@ -62,3 +62,42 @@ async def test_goals_invalid_period(client: AsyncClient, auth_headers: dict):
         headers=auth_headers,
     )
     assert r.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_goals_progress(client: AsyncClient, auth_headers: dict):
+    rw = await client.post("/wallets", json={"name": "Goal-Wallet"}, headers=auth_headers)
+    wallet_id = rw.json()["id"]
+    sc = (await client.get("/subcategories?type=investment", headers=auth_headers)).json()[0]["id"]
+    r = await client.post(
+        "/goals",
+        json={
+            "title": "Invest $400",
+            "target_cents": 40000,
+            "goal_type": "investment",
+            "period_start": "2025-06-01",
+            "period_end": "2025-06-30",
+        },
+        headers=auth_headers,
+    )
+    goal_id = r.json()["id"]
+    for amount, day in ((10000, "2025-06-05"), (20000, "2025-06-30"), (50000, "2025-07-01")):
+        r = await client.post(
+            "/transactions",
+            json={
+                "wallet_id": wallet_id,
+                "type": "investment",
+                "subcategory_id": sc,
+                "amount_cents": amount,
+                "transaction_date": day,
+            },
+            headers=auth_headers,
+        )
+        assert r.status_code == 201
+
+    r = await client.get("/goals/progress", headers=auth_headers)
+    assert r.status_code == 200
+    goal = next(g for g in r.json() if g["id"] == goal_id)
+    assert goal["progress_cents"] == 30000
+    assert goal["remaining_cents"] == 10000
+    assert goal["percent_complete"] == 75.0
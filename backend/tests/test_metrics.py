@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app import database
+from app.config import settings
+from app.metrics import PoolMetrics
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics_record_waits_and_exhaustion():
+    metrics = PoolMetrics("test", max_overflow=0, slow_ms=50)
+    engine = create_async_engine(
+        settings.database_url, poolclass=metrics.pool_class(), pool_size=1, max_overflow=0, pool_timeout=0.2
+    )
+    try:
+        async with engine.connect() as held:
+            await held.execute(text("SELECT 1"))
+            assert metrics.snapshot(engine.pool)["utilization"] == 1.0
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+
+            async def release_soon():
+                await asyncio.sleep(0.1)
+                await held.close()
+
+            # A checkout that has to wait for the held connection is timed as such
+            release = asyncio.create_task(release_soon())
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            await release
+        snapshot = metrics.snapshot(engine.pool)
+    finally:
+        await engine.dispose()
+    assert snapshot["checkouts"] == 2 and snapshot["timeouts"] == 1
+    assert snapshot["wait_ms"]["max"] >= 50
+    assert snapshot["checked_out"] == 0 and snapshot["idle"] == 1 and snapshot["utilization"] == 0
+
+
+@pytest.mark.asyncio
+async def test_pgbouncer_mode_disables_prepared_statement_caching(monkeypatch):
+    monkeypatch.setattr(settings, "db_pgbouncer", True)
+    connect_args = database._connect_args()
+    assert connect_args["statement_cache_size"] == 0 and connect_args["prepared_statement_cache_size"] == 0
+    engine = create_async_engine(settings.database_url, connect_args=connect_args)
+    try:
+        async with engine.connect() as conn:
+            for i in range(3):
+                assert (await conn.execute(text("SELECT CAST(:i AS integer)"), {"i": i})).scalar_one() == i
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics_endpoint(client: AsyncClient, monkeypatch):
+    assert (await client.get("/metrics/pool")).status_code == 404
+
+    monkeypatch.setattr(settings, "db_pool_metrics_enabled", True)
+    r = await client.get("/metrics/pool")
+    assert r.status_code == 200
+    primary = r.json()["primary"]
+    assert primary["pool_size"] == settings.db_pool_size and primary["max_overflow"] == settings.db_max_overflow
+    assert {"p50", "p99", "max"} <= primary["wait_ms"].keys()
@@ -0,0 +1,60 @@
+"""EXPLAIN the hot queries with sequential scans disabled: a Seq Scan that survives means no usable index."""
+import json
+
+import pytest
+from sqlalchemy import event, text
+
+from app.aggregates import budget_progress, goal_progress
+from app.routers.budgets import list_budgets
+from app.routers.chat import _fetch_user_financial_data
+from app.routers.goals import list_goals
+from app.routers.transactions import list_transactions
+from app.routers.wallets import list_wallets
+from tests.conftest import _test_engine, test_session_factory as session_factory
+
+# Tables that grow with usage; small lookup tables (users, subcategories) may be scanned.
+LARGE_TABLES = {"transactions", "wallets", "budgets", "goals"}
+
+
+def _seq_scans(plan: dict) -> list[str]:
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in LARGE_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(_seq_scans(child))
+    return found
+
+
+@pytest.mark.asyncio
+async def test_hot_queries_use_indexes(test_user):
+    user_id, _ = test_user
+    captured: list[tuple[str, tuple]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(_test_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with session_factory() as db:
+            await list_transactions(
+                wallet_id=None, type=None, date_from=None, date_to=None, user_id=user_id, db=db
+            )
+            await list_wallets(user_id=user_id, db=db)
+            await list_budgets(period_start=None, period_end=None, user_id=user_id, db=db)
+            await list_goals(period_start=None, period_end=None, user_id=user_id, db=db)
+            await budget_progress(db, user_id)
+            await goal_progress(db, user_id)
+        await _fetch_user_financial_data(session_factory, user_id)
+    finally:
+        event.remove(_test_engine.sync_engine, "before_cursor_execute", capture)
+    assert captured
+
+    async with _test_engine.connect() as conn:
+        await conn.execute(text("SET enable_seqscan = off"))
+        for statement, parameters in captured:
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = result.scalar_one()
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            scans = _seq_scans(plan[0]["Plan"])
+            assert not scans, f"Seq Scan on {scans} for:\n{statement}"
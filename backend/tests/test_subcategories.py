@@ -1,5 +1,13 @@
+import asyncio
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import func, select
+
+from app import main
+from app.config import settings
+from app.models import SchemaMarker, Subcategory
+from tests.conftest import test_session_factory as session_factory
 
 
 @pytest.mark.asyncio
@@ -53,3 +61,38 @@ async def test_subcategories_delete_owned_only(client: AsyncClient, auth_headers
         headers=auth_headers,
     )
     assert r.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_seed_default_subcategories_is_idempotent_across_workers():
+    async def seed():
+        async with session_factory() as session:
+            await main.seed_default_subcategories_session(session)
+
+    await asyncio.gather(*(seed() for _ in range(4)))
+    async with session_factory() as session:
+        counts = (await session.execute(
+            select(func.count()).where(Subcategory.user_id.is_(None)).group_by(Subcategory.transaction_type, Subcategory.name)
+        )).scalars().all()
+        version = await session.scalar(select(SchemaMarker.version).where(SchemaMarker.name == "default_subcategories"))
+    assert len(counts) == len(main.DEFAULT_SUBCATEGORIES) and set(counts) == {1}
+    assert version == main.DEFAULT_SUBCATEGORIES_VERSION
+
+
+@pytest.mark.asyncio
+async def test_seed_skipped_when_marked(monkeypatch):
+    async with session_factory() as session:
+        await main.seed_default_subcategories_session(session)
+    calls = []
+
+    async def fake_seed(session):
+        calls.append(session)
+
+    monkeypatch.setattr(main, "async_session_factory", session_factory)
+    monkeypatch.setattr(main, "seed_default_subcategories_session", fake_seed)
+    monkeypatch.setattr(settings, "seed_skip_when_marked", True)
+    await main.seed_default_subcategories()
+    assert calls == []
+    monkeypatch.setattr(settings, "seed_skip_when_marked", False)
+    await main.seed_default_subcategories()
+    assert len(calls) == 1
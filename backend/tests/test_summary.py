@@ -0,0 +1,58 @@
+from datetime import date
+
+import pytest
+from httpx import AsyncClient
+
+
+@pytest.mark.asyncio
+async def test_summary_totals(client: AsyncClient, auth_headers: dict):
+    rw = await client.post("/wallets", json={"name": "Summary-Wallet"}, headers=auth_headers)
+    wallet_id = rw.json()["id"]
+    empty = await client.post("/wallets", json={"name": "Empty-Wallet"}, headers=auth_headers)
+    income_sc = (await client.get("/subcategories?type=income", headers=auth_headers)).json()[0]["id"]
+    expense_sc = (await client.get("/subcategories?type=expense", headers=auth_headers)).json()[0]["id"]
+    for tx_type, sc, amount, day in (
+        ("income", income_sc, 100000, 1),
+        ("expense", expense_sc, 2500, 2),
+        ("expense", expense_sc, 1500, 3),
+        ("expense", expense_sc, 9900, 28),
+    ):
+        r = await client.post(
+            "/transactions",
+            json={
+                "wallet_id": wallet_id,
+                "type": tx_type,
+                "subcategory_id": sc,
+                "amount_cents": amount,
+                "transaction_date": date(2025, 4, day).isoformat(),
+            },
+            headers=auth_headers,
+        )
+        assert r.status_code == 201
+
+    r = await client.get(
+        "/summary", params={"date_from": "2025-04-01", "date_to": "2025-04-10"}, headers=auth_headers
+    )
+    assert r.status_code == 200
+    data = r.json()
+    by_type = {t["type"]: t for t in data["by_type"]}
+    assert by_type["income"]["total_cents"] == 100000
+    assert by_type["expense"] == {"type": "expense", "total_cents": 4000, "count": 2}
+
+    wallets = {w["wallet_id"]: w for w in data["by_wallet"]}
+    assert wallets[wallet_id]["balance_cents"] == 96000
+    assert wallets[empty.json()["id"]]["count"] == 0
+
+    subs = {(s["subcategory_id"], s["type"]): s for s in data["by_subcategory"]}
+    assert subs[(expense_sc, "expense")]["total_cents"] == 4000
+
+    r = await client.get("/summary", headers=auth_headers)
+    assert {t["type"]: t for t in r.json()["by_type"]}["expense"]["total_cents"] == 13900
+
+
+@pytest.mark.asyncio
+async def test_summary_invalid_window(client: AsyncClient, auth_headers: dict):
+    r = await client.get(
+        "/summary", params={"date_from": "2025-04-10", "date_to": "2025-04-01"}, headers=auth_headers
+    )
+    assert r.status_code == 400
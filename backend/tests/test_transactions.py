@@ -1,3 +1,7 @@
+import csv
+import io
+import json
+import time
 from datetime import date
 from uuid import uuid4
 
@@ -88,3 +92,268 @@ async def test_transactions_wallet_other_user_404(client: AsyncClient, auth_head
         headers=auth_headers,
     )
     assert r.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_transactions_page_and_stream(client: AsyncClient, auth_headers: dict):
+    """Walking pages with next_cursor and streaming NDJSON both return every row, newest first."""
+    rw = await client.post("/wallets", json={"name": "Page-Wallet"}, headers=auth_headers)
+    wallet_id = rw.json()["id"]
+    rsc = await client.get("/subcategories?type=expense", headers=auth_headers)
+    subcategory_id = rsc.json()[0]["id"]
+    created = []
+    for day in (1, 2, 2, 3, 4):
+        r = await client.post(
+            "/transactions",
+            json={
+                "wallet_id": wallet_id,
+                "type": "expense",
+                "subcategory_id": subcategory_id,
+                "amount_cents": 100 * day,
+                "transaction_date": date(2025, 3, day).isoformat(),
+            },
+            headers=auth_headers,
+        )
+        assert r.status_code == 201
+        created.append(r.json()["id"])
+
+    r = await client.get("/transactions", params={"wallet_id": wallet_id}, headers=auth_headers)
+    expected = [t["id"] for t in r.json()]
+    assert sorted(expected) == sorted(created)
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"wallet_id": wallet_id, "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        r = await client.get("/transactions/page", params=params, headers=auth_headers)
+        assert r.status_code == 200
+        page = r.json()
+        assert len(page["items"]) <= 2
+        seen.extend(t["id"] for t in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == expected
+
+    r = await client.get("/transactions/stream", params={"wallet_id": wallet_id}, headers=auth_headers)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    streamed = [json.loads(line)["id"] for line in r.text.splitlines() if line]
+    assert streamed == expected
+
+
+@pytest.mark.asyncio
+async def test_transactions_page_invalid_cursor(client: AsyncClient, auth_headers: dict):
+    r = await client.get("/transactions/page", params={"cursor": "not-a-cursor"}, headers=auth_headers)
+    assert r.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_transactions_import_csv_reports_row_errors(client: AsyncClient, auth_headers: dict):
+    wallet_id = (await client.post("/wallets", json={"name": "Import-CSV"}, headers=auth_headers)).json()["id"]
+    csv_body = (
+        "Date,Amount,Category,Description\r\n"
+        "2025-01-02,-12.50,food,\"Market, weekly\"\r\n"
+        "01/03/2025,\"2,000.00\",,\"Pay\nJanuary\"\r\n"
+        "2025-01-04,abc,,Broken amount\r\n"
+        "2025-01-05,-3.00,No such category,\r\n"
+        "2025-01-06,-4.00,,\r\n"
+    )
+    r = await client.post(
+        f"/transactions/import?wallet_id={wallet_id}",
+        content=csv_body.encode(),
+        headers={**auth_headers, "Content-Type": "text/csv"},
+    )
+    assert r.status_code == 200
+    data = r.json()
+    assert (data["imported"], data["failed"]) == (3, 2)
+    assert [e["row"] for e in data["errors"]] == [5, 6]
+    assert "Invalid amount" in data["errors"][0]["detail"]
+
+    txs = (await client.get(f"/transactions?wallet_id={wallet_id}", headers=auth_headers)).json()
+    by_amount = {t["amount_cents"]: t for t in txs}
+    assert by_amount[1250]["type"] == "expense" and by_amount[1250]["description"] == "Market, weekly"
+    assert by_amount[200000]["type"] == "income" and by_amount[200000]["transaction_date"] == "2025-01-03"
+    assert by_amount[400]["type"] == "expense"
+
+
+@pytest.mark.asyncio
+async def test_transactions_import_recovers_from_stray_quote_and_nul(client: AsyncClient, auth_headers: dict):
+    wallet_id = (await client.post("/wallets", json={"name": "Import-Stray"}, headers=auth_headers)).json()["id"]
+    rows = [f"2025-01-{day % 28 + 1:02d},-1.{day % 100:02d},,Row {day}" for day in range(20000)]
+    rows[1] = '2025-01-02,-5.00,,"Never closed'
+    rows[3] = "2025-01-04,-6.00,,Has a \x00 in it"
+    started = time.perf_counter()
+    r = await client.post(
+        f"/transactions/import?wallet_id={wallet_id}",
+        content=("date,amount,category,description\n" + "\n".join(rows)).encode(),
+        headers={**auth_headers, "Content-Type": "text/csv"},
+    )
+    assert time.perf_counter() - started < 20  # re-joining the open record on every line took minutes
+    assert r.status_code == 200
+    data = r.json()
+    assert (data["imported"], data["failed"]) == (19998, 2)
+    assert data["errors"] == [
+        {"row": 3, "detail": "Unterminated quoted field"},
+        {"row": 5, "detail": "Contains a NUL character"},
+    ]
+
+    r = await client.post(
+        f"/transactions/import?wallet_id={wallet_id}&format=qif",
+        content=b"D2/12/2025\nT-7.25\nPLun\x00ch\n^\nD2/13/2025\nT1\n^\n",
+        headers=auth_headers,
+    )
+    assert (r.json()["imported"], r.json()["failed"]) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_transactions_import_ofx_and_qif(client: AsyncClient, auth_headers: dict):
+    wallet_id = (await client.post("/wallets", json={"name": "Import-OFX"}, headers=auth_headers)).json()["id"]
+    ofx = (
+        "OFXHEADER:100\nDATA:OFXSGML\n\n<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>\n"
+        "<STMTTRN>\n<TRNTYPE>DEBIT\n<DTPOSTED>20250210120000\n<TRNAMT>-42.10\n<NAME>Coffee Shop\n</STMTTRN>\n"
+        "<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20250211<TRNAMT>100.00<NAME>Refund<MEMO>Order 7</STMTTRN>\n"
+        "</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>\n"
+    )
+    r = await client.post(
+        f"/transactions/import?wallet_id={wallet_id}&format=ofx", content=ofx.encode(), headers=auth_headers
+    )
+    assert r.json() == {"imported": 2, "failed": 0, "errors": []}
+
+    qif = "!Type:Bank\nD2/12'25\nT-7.25\nPLunch\nLHousehold:Food\n^\nD2/13/2025\nT1,500.00\nPSalary\n^\nDnot a date\nT1\n^\n"
+    r = await client.post(
+        f"/transactions/import?wallet_id={wallet_id}",
+        content=qif.encode(),
+        headers={**auth_headers, "Content-Type": "application/x-qif"},
+    )
+    assert (r.json()["imported"], r.json()["failed"]) == (2, 1)
+
+    txs = (await client.get(f"/transactions?wallet_id={wallet_id}", headers=auth_headers)).json()
+    assert {(t["transaction_date"], t["amount_cents"], t["description"]) for t in txs} == {
+        ("2025-02-10", 4210, "Coffee Shop"),
+        ("2025-02-11", 10000, "Refund - Order 7"),
+        ("2025-02-12", 725, "Lunch"),
+        ("2025-02-13", 150000, "Salary"),
+    }
+
+
+@pytest.mark.asyncio
+async def test_transactions_import_rejects_bad_requests(client: AsyncClient, auth_headers: dict):
+    wallet_id = (await client.post("/wallets", json={"name": "Import-Bad"}, headers=auth_headers)).json()["id"]
+    r = await client.post(f"/transactions/import?wallet_id={uuid4()}&format=csv", content=b"date,amount\n", headers=auth_headers)
+    assert r.status_code == 404
+    r = await client.post(f"/transactions/import?wallet_id={wallet_id}", content=b"date,amount\n", headers=auth_headers)
+    assert r.status_code == 400
+    r = await client.post(
+        f"/transactions/import?wallet_id={wallet_id}&format=csv", content=b"when,how much\n2025-01-01,1\n", headers=auth_headers
+    )
+    assert r.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_transactions_batch(client: AsyncClient, auth_headers: dict):
+    wallet_id = (await client.post("/wallets", json={"name": "Batch-Wallet"}, headers=auth_headers)).json()["id"]
+    subs = (await client.get("/subcategories?type=expense", headers=auth_headers)).json()
+    sub_a, sub_b = subs[0]["id"], subs[1]["id"]
+    new = {"wallet_id": wallet_id, "type": "expense", "subcategory_id": sub_a, "transaction_date": "2025-03-01"}
+
+    r = await client.post(
+        "/transactions/batch",
+        json={"create": [{**new, "amount_cents": 100 * (i + 1), "tags": ["batch"]} for i in range(5)]},
+        headers=auth_headers,
+    )
+    assert r.status_code == 200
+    created = r.json()["created"]
+    assert [t["amount_cents"] for t in created] == [100, 200, 300, 400, 500]
+    ids = [t["id"] for t in created]
+
+    r = await client.post(
+        "/transactions/batch",
+        json={
+            "create": [{**new, "amount_cents": 999}],
+            "update": [{"id": id, "subcategory_id": sub_b} for id in ids[:3]] + [{"id": ids[3], "amount_cents": 1}],
+            "delete": [ids[4]],
+        },
+        headers=auth_headers,
+    )
+    assert r.status_code == 200
+    data = r.json()
+    assert [t["subcategory_id"] for t in data["updated"][:3]] == [sub_b] * 3
+    assert data["updated"][3]["amount_cents"] == 1 and data["updated"][3]["subcategory_id"] == sub_a
+    assert data["deleted"] == [ids[4]]
+
+    txs = (await client.get(f"/transactions?wallet_id={wallet_id}", headers=auth_headers)).json()
+    assert sorted(t["amount_cents"] for t in txs) == [1, 100, 200, 300, 999]
+
+
+@pytest.mark.asyncio
+async def test_transactions_batch_is_all_or_nothing(client: AsyncClient, auth_headers: dict):
+    wallet_id = (await client.post("/wallets", json={"name": "Batch-Atomic"}, headers=auth_headers)).json()["id"]
+    sub = (await client.get("/subcategories?type=expense", headers=auth_headers)).json()[0]["id"]
+    new = {"wallet_id": wallet_id, "type": "expense", "subcategory_id": sub, "amount_cents": 5, "transaction_date": "2025-03-01"}
+    tx_id = (await client.post("/transactions", json=new, headers=auth_headers)).json()["id"]
+
+    r = await client.post(
+        "/transactions/batch", json={"create": [new], "delete": [tx_id, str(uuid4())]}, headers=auth_headers
+    )
+    assert r.status_code == 404
+    r = await client.post(
+        "/transactions/batch", json={"create": [{**new, "wallet_id": str(uuid4())}], "delete": [tx_id]}, headers=auth_headers
+    )
+    assert r.status_code == 404
+    r = await client.post(
+        "/transactions/batch", json={"update": [{"id": tx_id, "amount_cents": 6}], "delete": [tx_id]}, headers=auth_headers
+    )
+    assert r.status_code == 400
+    txs = (await client.get(f"/transactions?wallet_id={wallet_id}", headers=auth_headers)).json()
+    assert [t["id"] for t in txs] == [tx_id]
+
+
+@pytest.mark.asyncio
+async def test_transactions_export_formats(client: AsyncClient, auth_headers: dict):
+    wallet_id = (await client.post("/wallets", json={"name": "Export-Wallet"}, headers=auth_headers)).json()["id"]
+    sub = (await client.get("/subcategories?type=expense", headers=auth_headers)).json()[0]["id"]
+    new = {"wallet_id": wallet_id, "type": "expense", "subcategory_id": sub, "transaction_date": "2025-04-01"}
+    await client.post(
+        "/transactions/batch",
+        json={"create": [
+            {**new, "amount_cents": 250, "description": 'Comma, "quoted"', "tags": ["a", "b"]},
+            {**new, "amount_cents": 100, "transaction_date": "2025-03-01"},
+        ]},
+        headers=auth_headers,
+    )
+
+    r = await client.get(f"/transactions/export?wallet_id={wallet_id}", headers=auth_headers)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/csv")
+    assert 'filename="transactions.csv"' in r.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(r.text)))
+    assert [(row["transaction_date"], row["amount_cents"]) for row in rows] == [("2025-04-01", "250"), ("2025-03-01", "100")]
+    assert rows[0]["description"] == 'Comma, "quoted"' and json.loads(rows[0]["tags"]) == ["a", "b"]
+
+    r = await client.get(f"/transactions/export?wallet_id={wallet_id}&format=ndjson", headers=auth_headers)
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert [(line["type"], line["amount_cents"], line["tags"]) for line in lines] == [("expense", 250, ["a", "b"]), ("expense", 100, [])]
+
+
+@pytest.mark.asyncio
+async def test_transactions_export_parquet(client: AsyncClient, auth_headers: dict):
+    pq = pytest.importorskip("pyarrow.parquet")
+    wallet_id = (await client.post("/wallets", json={"name": "Export-Parquet"}, headers=auth_headers)).json()["id"]
+    sub = (await client.get("/subcategories?type=income", headers=auth_headers)).json()[0]["id"]
+    await client.post(
+        "/transactions/batch",
+        json={"create": [
+            {"wallet_id": wallet_id, "type": "income", "subcategory_id": sub, "amount_cents": i + 1, "transaction_date": "2025-05-01"}
+            for i in range(3)
+        ]},
+        headers=auth_headers,
+    )
+    r = await client.get(f"/transactions/export?wallet_id={wallet_id}&format=parquet", headers=auth_headers)
+    assert r.status_code == 200
+    table = pq.read_table(io.BytesIO(r.content))
+    assert sorted(table.column("amount_cents").to_pylist()) == [1, 2, 3]
+    assert set(table.column("type").to_pylist()) == {"income"}
+    assert table.column("transaction_date").to_pylist() == [date(2025, 5, 1)] * 3
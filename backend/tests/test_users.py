@@ -30,3 +30,7 @@ async def test_put_me_upsert(client: AsyncClient, auth_headers: dict):
     assert r.json()["email"] == "updated@example.com"
     r2 = await client.get("/users/me", headers=auth_headers)
     assert r2.json()["email"] == "updated@example.com"
+    r3 = await client.put("/users/me", json={}, headers=auth_headers)
+    assert r3.status_code == 200
+    assert r3.json()["email"] == "updated@example.com"
+    assert r3.json()["id"] == r.json()["id"]
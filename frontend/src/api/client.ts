@@ -9,11 +9,7 @@ async function getToken(): Promise<string> {
   return token
 }
 
-export async function request<T>(
-  method: string,
-  path: string,
-  body?: unknown
-): Promise<T> {
+async function send(method: string, path: string, body?: unknown): Promise<Response> {
   const token = await getToken()
   const url = path.startsWith('http') ? path : `${baseUrl}${path}`
   const opts: RequestInit = {
@@ -42,10 +38,49 @@ export async function request<T>(
     }
     throw new Error(detail)
   }
+  return res
+}
+
+export async function request<T>(
+  method: string,
+  path: string,
+  body?: unknown
+): Promise<T> {
+  const res = await send(method, path, body)
   if (res.status === 204) return undefined as T
   return res.json() as Promise<T>
 }
 
+/** POST and read a Server-Sent Events response, calling onEvent for each event as it arrives. */
+export async function postEventStream(
+  path: string,
+  body: unknown,
+  onEvent: (event: string, data: unknown) => void
+): Promise<void> {
+  const res = await send('POST', path, body)
+  if (!res.body) throw new Error('Streaming not supported')
+  const reader = res.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  for (;;) {
+    const { done, value } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+    let sep: number
+    while ((sep = buffer.indexOf('\n\n')) !== -1) {
+      const block = buffer.slice(0, sep)
+      buffer = buffer.slice(sep + 2)
+      let event = 'message'
+      let data = ''
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice(7)
+        else if (line.startsWith('data: ')) data += line.slice(6)
+      }
+      onEvent(event, data ? JSON.parse(data) : null)
+    }
+  }
+}
+
 export const api = {
   get: <T>(path: string) => request<T>('GET', path),
   post: <T>(path: string, body?: unknown) => request<T>('POST', path, body),
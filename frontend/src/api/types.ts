@@ -42,6 +42,11 @@ export interface Transaction {
   created_at: string
 }
 
+export interface TransactionPage {
+  items: Transaction[]
+  next_cursor: string | null
+}
+
 export interface TransactionCreate {
   wallet_id: string
   type: TransactionType
@@ -71,6 +76,12 @@ export interface Budget {
   created_at: string
 }
 
+export interface BudgetProgress extends Budget {
+  spent_cents: number
+  remaining_cents: number
+  percent_used: number
+}
+
 export interface BudgetCreate {
   subcategory_id: string
   limit_cents: number
@@ -96,6 +107,12 @@ export interface Goal {
   created_at: string
 }
 
+export interface GoalProgress extends Goal {
+  progress_cents: number
+  remaining_cents: number
+  percent_complete: number
+}
+
 export interface GoalCreate {
   title: string
   target_cents: number
@@ -112,9 +129,54 @@ export interface GoalUpdate {
   period_end?: string
 }
 
+export interface TypeTotal {
+  type: TransactionType
+  total_cents: number
+  count: number
+}
+
+export interface WalletTotal {
+  wallet_id: string
+  name: string
+  inflow_cents: number
+  outflow_cents: number
+  balance_cents: number
+  count: number
+}
+
+export interface SubcategoryTotal {
+  subcategory_id: string
+  name: string
+  type: TransactionType
+  total_cents: number
+  count: number
+}
+
+export interface Summary {
+  date_from: string | null
+  date_to: string | null
+  by_type: TypeTotal[]
+  by_wallet: WalletTotal[]
+  by_subcategory: SubcategoryTotal[]
+}
+
 export interface ChatResponse {
   reply: string
   prompt?: string
+  session_id?: string
+}
+
+export interface ChatSession {
+  id: string
+  title: string
+  message_count: number
+  created_at: string
+  updated_at: string
+}
+
+export interface ChatSessionDetail extends ChatSession {
+  summary: string
+  messages: { role: 'user' | 'assistant'; content: string; created_at: string }[]
 }
 
 export type DemoProfile = 'frequent_shopper' | 'savvy_investor' | 'budget_conscious'
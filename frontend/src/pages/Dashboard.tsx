@@ -1,33 +1,46 @@
 import { useEffect, useRef, useState } from 'react'
-import { api } from '../api/client'
-import type { Budget, Goal, Subcategory, Transaction, Wallet, ChatResponse } from '../api/types'
+import { api, postEventStream } from '../api/client'
+import type {
+  BudgetProgress,
+  GoalProgress,
+  Subcategory,
+  Summary,
+  Transaction,
+  TransactionPage,
+  WalletTotal,
+  ChatResponse,
+} from '../api/types'
 import { formatCents, formatDate } from '../utils/format'
 import './Dashboard.css'
 
+type ChatMessage = { role: 'user' | 'ai'; text: string; prompt?: string }
+
 export function Dashboard() {
-  const [wallets, setWallets] = useState<Wallet[]>([])
-  const [transactions, setTransactions] = useState<Transaction[]>([])
-  const [goals, setGoals] = useState<Goal[]>([])
-  const [budgets, setBudgets] = useState<Budget[]>([])
+  const [wallets, setWallets] = useState<WalletTotal[]>([])
+  const [recent10, setRecent10] = useState<Transaction[]>([])
+  const [goals, setGoals] = useState<GoalProgress[]>([])
+  const [budgets, setBudgets] = useState<BudgetProgress[]>([])
   const [subcategories, setSubcategories] = useState<Record<string, Subcategory>>({})
 
   const [message, setMessage] = useState('')
-  const [chatHistory, setChatHistory] = useState<{ role: 'user' | 'ai'; text: string; prompt?: string }[]>([])
+  const [chatHistory, setChatHistory] = useState<ChatMessage[]>([])
   const [chatLoading, setChatLoading] = useState(false)
   const [chatError, setChatError] = useState<string | null>(null)
+  // Server-side chat session, so follow-up questions are answered with the earlier turns in mind.
+  const [chatSessionId, setChatSessionId] = useState<string | null>(null)
   const chatEndRef = useRef<HTMLDivElement>(null)
 
   useEffect(() => {
     Promise.all([
-      api.get<Wallet[]>('/wallets'),
-      api.get<Transaction[]>('/transactions'),
-      api.get<Goal[]>('/goals'),
-      api.get<Budget[]>('/budgets'),
+      api.get<Summary>('/summary'),
+      api.get<TransactionPage>('/transactions/page?limit=10'),
+      api.get<GoalProgress[]>('/goals/progress'),
+      api.get<BudgetProgress[]>('/budgets/progress'),
       api.get<Subcategory[]>('/subcategories'),
     ])
       .then(([w, t, g, b, s]) => {
-        setWallets(w)
-        setTransactions(t)
+        setWallets(w.by_wallet)
+        setRecent10(t.items)
         setGoals(g)
         setBudgets(b)
         const subMap: Record<string, Subcategory> = {}
@@ -41,43 +54,6 @@ export function Dashboard() {
     chatEndRef.current?.scrollIntoView({ behavior: 'smooth' })
   }, [chatHistory, chatLoading])
 
-  // Wallet balances from transactions
-  const walletBalances: Record<string, number> = {}
-  wallets.forEach((w) => { walletBalances[w.id] = 0 })
-  transactions.forEach((t) => {
-    if (walletBalances[t.wallet_id] === undefined) walletBalances[t.wallet_id] = 0
-    walletBalances[t.wallet_id] += t.type === 'income' ? t.amount_cents : -t.amount_cents
-  })
-
-  // Last 10 transactions sorted by date desc
-  const recent10 = [...transactions]
-    .sort((a, b) => b.transaction_date.localeCompare(a.transaction_date))
-    .slice(0, 10)
-
-  function goalProgress(g: Goal): number {
-    const sum = transactions
-      .filter(
-        (t) =>
-          t.type === g.goal_type &&
-          t.transaction_date >= g.period_start &&
-          t.transaction_date <= g.period_end,
-      )
-      .reduce((acc, t) => acc + t.amount_cents, 0)
-    return g.target_cents > 0 ? Math.min(sum / g.target_cents, 1) : 0
-  }
-
-  function budgetProgress(b: Budget): number {
-    const sum = transactions
-      .filter(
-        (t) =>
-          t.subcategory_id === b.subcategory_id &&
-          t.transaction_date >= b.period_start &&
-          t.transaction_date <= b.period_end,
-      )
-      .reduce((acc, t) => acc + t.amount_cents, 0)
-    return b.limit_cents > 0 ? Math.min(sum / b.limit_cents, 1) : 0
-  }
-
   async function handleChat(e: React.FormEvent) {
     e.preventDefault()
     if (!message.trim() || chatLoading) return
@@ -86,9 +62,30 @@ export function Dashboard() {
     setMessage('')
     setChatLoading(true)
     setChatError(null)
+    let started = false
+    // The AI bubble is appended on the first streamed event and updated in place afterwards.
+    const updateReply = (update: (m: ChatMessage) => ChatMessage) => {
+      const append = !started
+      started = true
+      setChatHistory((h) =>
+        append ? [...h, update({ role: 'ai', text: '' })] : [...h.slice(0, -1), update(h[h.length - 1])],
+      )
+    }
     try {
-      const data = await api.post<ChatResponse>('/chat', { message: userMsg })
-      setChatHistory((h) => [...h, { role: 'ai', text: data.reply, prompt: data.prompt }])
+      const body = chatSessionId ? { message: userMsg, session_id: chatSessionId } : { message: userMsg }
+      await postEventStream('/chat/stream', body, (event, data) => {
+        if (event === 'delta') {
+          const { text } = data as { text: string }
+          updateReply((m) => ({ ...m, text: m.text + text }))
+          setChatLoading(false)
+        } else if (event === 'done') {
+          const { reply, prompt, session_id } = data as ChatResponse
+          updateReply((m) => ({ ...m, text: reply, prompt }))
+          if (session_id) setChatSessionId(session_id)
+        } else if (event === 'error') {
+          setChatError((data as { detail: string }).detail)
+        }
+      })
     } catch (err) {
       setChatError(err instanceof Error ? err.message : 'Failed to send')
     } finally {
@@ -107,9 +104,9 @@ export function Dashboard() {
           ) : (
             <ul className="db-wallet-list">
               {wallets.map((w) => {
-                const bal = walletBalances[w.id] ?? 0
+                const bal = w.balance_cents
                 return (
-                  <li key={w.id}>
+                  <li key={w.wallet_id}>
                     <span className="db-wallet-name">{w.name}</span>
                     <span className={`db-wallet-bal ${bal >= 0 ? 'pos' : 'neg'}`}>
                       {bal < 0 ? '−' : ''}{formatCents(Math.abs(bal))}
@@ -128,7 +125,7 @@ export function Dashboard() {
           ) : (
             <ul className="db-progress-list">
               {goals.map((g) => {
-                const pct = Math.round(goalProgress(g) * 100)
+                const pct = Math.min(Math.round(g.percent_complete), 100)
                 return (
                   <li key={g.id}>
                     <div className="db-progress-header">
@@ -152,7 +149,7 @@ export function Dashboard() {
           ) : (
             <ul className="db-progress-list">
               {budgets.map((b) => {
-                const pct = Math.round(budgetProgress(b) * 100)
+                const pct = Math.round(b.percent_used)
                 const over = pct >= 100
                 return (
                   <li key={b.id}>